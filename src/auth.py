@@ -2,12 +2,16 @@
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
 from .config import CLIENT_ID, CLIENT_SECRET, REDIRECT_URI, SCOPES
+from .utils.limitador import SpotifyLimitado
 
-def get_spotify_client() -> spotipy.Spotify:
+def get_spotify_client(open_browser: bool = True) -> spotipy.Spotify:
+    """Cliente autenticado. Sin navegador (cron/servidor) se usa el token en caché."""
     auth_manager = SpotifyOAuth(
         client_id=CLIENT_ID,
         client_secret=CLIENT_SECRET,
         redirect_uri=REDIRECT_URI,
         scope=SCOPES,
+        open_browser=open_browser,
     )
-    return spotipy.Spotify(auth_manager=auth_manager)
+    # Todas las ventanas comparten este cliente y, con él, el límite de ritmo
+    return SpotifyLimitado(auth_manager=auth_manager)
@@ -42,6 +42,41 @@ SCOPES: str = (
 _SRC_DIR = Path(__file__).resolve().parent
 # Carpeta `src/assets/`
 ICON_PATH: Path = _SRC_DIR / "assets"
+# Asignaciones podcast → playlist (antes `data_podcasts.py`)
+ASIGNACIONES_PATH: Path = _SRC_DIR / "data_podcasts.json"
+# Estado local persistente (marcas de sincronización, cachés…). No va a git.
+DATA_DIR: Path = Path(os.getenv("SPOTYV_DATA_DIR", _SRC_DIR.parent / ".spotyv"))
+
+# ---------------------------------------------------
+# SINCRONIZACIÓN
+# ---------------------------------------------------
+# Hilos simultáneos para sincronizar pares podcast/playlist
+SYNC_WORKERS: int = int(os.getenv("SYNC_WORKERS", "4"))
+
+# Segundos en que la discografía guardada de un artista se da por buena sin
+# consultar (pasado ese tiempo, una llamada de listado detecta novedades)
+DISCOGRAFIA_TTL: int = int(os.getenv("SPOTYV_DISCOGRAFIA_TTL", "3600"))
+
+# ---------------------------------------------------
+# LÍMITES DE LA API
+# ---------------------------------------------------
+# Ritmo sostenido (solicitudes/segundo), ráfaga permitida y llamadas en vuelo
+API_RPS: float = float(os.getenv("SPOTIFY_RPS", "8"))
+API_RAFAGA: int = int(os.getenv("SPOTIFY_RAFAGA", "16"))
+API_CONCURRENCIA: int = int(os.getenv("SPOTIFY_CONCURRENCIA", "8"))
+# Reintentos ante 429 / 5xx / errores de red
+API_REINTENTOS: int = int(os.getenv("SPOTIFY_REINTENTOS", "5"))
+# Páginas de un mismo listado que se piden a la vez (offset conocido)
+PAGINAS_EN_PARALELO: int = int(os.getenv("SPOTIFY_PAGINAS_PARALELO", "4"))
+# Conexiones HTTP keep-alive por host (igual a las llamadas en vuelo) y
+# timeouts (conexión, lectura) en segundos
+HTTP_POOL: int = int(os.getenv("SPOTIFY_HTTP_POOL", str(API_CONCURRENCIA)))
+HTTP_TIMEOUT: tuple = (
+    float(os.getenv("SPOTIFY_TIMEOUT_CONEXION", "3.05")),
+    float(os.getenv("SPOTIFY_TIMEOUT_LECTURA", "15")),
+)
+# Caché HTTP en disco (ETag / If-None-Match); 0 la desactiva
+HTTP_CACHE_MB: int = int(os.getenv("SPOTIFY_HTTP_CACHE_MB", "64"))
 
 # ---------------------------------------------------
 # PALETA DE COLORES
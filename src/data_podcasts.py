@@ -1,23 +0,0 @@
-"""Par de IDs podcast/playlist para sincronización"""
-data_podcasts = [
-    {"podcast": "0u8dE1kc9CkFn8bONEq0hE", "playlist": "1MreMp1Qm4gyKZa5B2HZun"},
-    {"podcast": "5JYQdA2dCaFRfCMLoUAbJp", "playlist": "5fBYes8twIslY3F41zcgwN"},
-    {"podcast": "5hiPtlvSfLe4S9S5S9RCwG", "playlist": "49aOapLd6aSH0s58MBVwCF"},
-    {"podcast": "6bDNRLtJsC0KCRFsSfpFA7", "playlist": "7arQDDHMeYQxQkSZM2Qc7J"},
-    {"podcast": "3dYxnrAnRqAf7uPP6jXqEV", "playlist": "10qPRgsFtdJQ0NUGq5fQVs"},
-    {"podcast": "1vGiDuVEehP90dv3H01WVE", "playlist": "1iIQuIEgKggq5xyaJPfvMz"},
-    {"podcast": "2hIY32m7kl5mixXkwnjTBd", "playlist": "487txxFyTL6aqzYWnfJcEG"},
-    {"podcast": "5XEKeuYWpH6CpEmxF0XiXl", "playlist": "4ES2LCF5xidpU32BsizcqC"},
-    {"podcast": "6HOxtj2TQHFOsdPLb73C1E", "playlist": "61q9qYyNcUH77LszD3QuN3"},
-    {"podcast": "2pwU20WESUl927rNFWFyw8", "playlist": "2zazPQz8WjHVFgOS2ENBGQ"},
-    {"podcast": "4pAsqlBRHAYjXVY9C7HUP3", "playlist": "2zazPQz8WjHVFgOS2ENBGQ"},
-    {"podcast": "0Gf2ESpFrmlPiPBxBUNecl", "playlist": "5l7PQHgCmknBVsDLc0b506"},
-    {"podcast": "58wsYLsa9QPrclg3cFRoG0", "playlist": "6XG0QwcWma7EqYkLNJxTUC"},
-    {"podcast": "3yGOOUkNFHnCb3qgmjOpC9", "playlist": "3HDvKTc8wutUMFss0M9x3K"},
-    {"podcast": "468pWe8prGZQg9ISmNj0TG", "playlist": "7I0DGPZpR5ANgl5g1dWDlM"},
-    {"podcast": "5aGWVedILYqaDE5h0cei8F", "playlist": "6OL7FV70KgzF0i8cJVKHfR"},
-    {"podcast": "3mfevY0cUHwttpv0NwZfKj", "playlist": "2eW2vXbDljYSH6789Fb66Y"},
-    {"podcast": "0rGBS35ThfPEPj7lDfbNcW", "playlist": "2zazPQz8WjHVFgOS2ENBGQ"},
-    {"podcast": "3VQwgOUOa4JoO6UWiVBPHa", "playlist": "2zazPQz8WjHVFgOS2ENBGQ"},
-    {"podcast": "6OFdeY2O9ZgS4ZKgcX7iZN", "playlist": "2zazPQz8WjHVFgOS2ENBGQ"}
-]
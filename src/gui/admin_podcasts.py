@@ -5,40 +5,13 @@ Vista de administración de asignaciones Podcast ↔ Playlist,
 integrada en la ventana principal al estilo Spotify.
 """
 
-import os
-import importlib.util
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 import src.config as cfg
 from spotipy import Spotify
 from .common import style_toplevel
-
-def cargar_asignaciones():
-    base = os.path.dirname(os.path.abspath(__file__))
-    ruta = os.path.abspath(os.path.join(base, "..", "data_podcasts.py"))
-    if not os.path.exists(ruta):
-        return []
-    spec = importlib.util.spec_from_file_location("data_podcasts", ruta)
-    mod = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(mod)
-    return mod.data_podcasts
-
-def guardar_asignaciones(asignaciones):
-    base = os.path.dirname(os.path.abspath(__file__))
-    ruta = os.path.abspath(os.path.join(base, "..", "data_podcasts.py"))
-    try:
-        with open(ruta, "w", encoding="utf-8") as f:
-            f.write('"""Par de IDs podcast/playlist para sincronización"""\n')
-            f.write("data_podcasts = [\n")
-            for a in asignaciones:
-                pod = a["podcast"].replace('"', '\\"')
-                pls = a["playlist"].replace('"', '\\"')
-                f.write(f'    {{"podcast": "{pod}", "playlist": "{pls}"}},\n')
-            f.write("]\n")
-        return True
-    except Exception as e:
-        messagebox.showerror("Error al guardar", f"No se pudo escribir:\n{e}")
-        return False
+from ..utils.asignaciones import AlmacenAsignaciones
+from ..utils.spotify_utils import iter_playlists_usuario
 
 
 class VentanaAdminPodcasts(tk.Toplevel):
@@ -63,7 +36,7 @@ class VentanaAdminPodcasts(tk.Toplevel):
                   foreground=[("selected", cfg.TEXT_PRIMARY)])
 
         # Datos
-        self.asignaciones = cargar_asignaciones()
+        self.asignaciones = AlmacenAsignaciones()
         self.selected = {"pod": "", "pl": ""}
 
         # Construir UI
@@ -130,15 +103,8 @@ class VentanaAdminPodcasts(tk.Toplevel):
         def buscar_playlist():
             q = entry_pl.get().strip()
             if not q: return
-            all_pl, res = [], self.sp.current_user_playlists(limit=50)
-            while True:
-                all_pl += res["items"]
-                if res["next"]:
-                    res = self.sp.next(res)
-                else:
-                    break
             lb_pl.delete(0, "end")
-            for p in all_pl:
+            for p in iter_playlists_usuario(self.sp):
                 if q.lower() in p["name"].lower():
                     lb_pl.insert("end", f'{p["name"]} — {p["id"]}')
         def sel_playlist():
@@ -166,11 +132,10 @@ class VentanaAdminPodcasts(tk.Toplevel):
             if not pod or not pl:
                 messagebox.showinfo("Faltan datos", "Selecciona podcast y playlist.")
                 return
-            if any(x["podcast"] == pod and x["playlist"] == pl for x in self.asignaciones):
+            if not self.asignaciones.agregar(pod, pl):
                 messagebox.showinfo("Duplicado", "Esa asignación ya existe.")
                 return
-            self.asignaciones.append({"podcast": pod, "playlist": pl})
-            refrescar_tabla()
+            tree.insert("", "end", values=(pod, pl))
 
         # — Tabla de asignaciones — #
         tbl_card = ttk.Frame(cont, style="Card.TFrame", padding=12)
@@ -188,22 +153,29 @@ class VentanaAdminPodcasts(tk.Toplevel):
 
         def refrescar_tabla():
             tree.delete(*tree.get_children())
-            for a in self.asignaciones:
+            for a in self.asignaciones.como_lista():
                 tree.insert("", "end", values=(a["podcast"], a["playlist"]))
 
         refrescar_tabla()
 
         # — Botones finales — #
-        foot = ttk.Frame(panel, style="Card.TFrame")
-        foot.pack(fill="x", pady=(0,8))
+        foot = ttk.Frame(cont, style="Card.TFrame")
+        foot.grid(row=3, column=0, columnspan=2, sticky="ew", pady=(0,8))
+        def on_eliminar():
+            for iid in tree.selection():
+                pod, pl = tree.item(iid, "values")
+                self.asignaciones.eliminar(pod, pl)
+                tree.delete(iid)
+
         ttk.Button(foot, text="Eliminar seleccionado",
-                   style="Accent.TButton",
-                   command=lambda:
-                     [self.asignaciones.pop(i) for i in reversed(tree.selection()) or [None]] or refrescar_tabla()
+                   style="Accent.TButton", command=on_eliminar
         ).pack(side="left", padx=8)
         ttk.Button(foot, text="Guardar cambios",
                    style="Accent.TButton", command=lambda: on_guardar()).pack(side="left")
 
         def on_guardar():
-            if guardar_asignaciones(self.asignaciones):
+            if self.asignaciones.guardar():
                 messagebox.showinfo("Guardado", "Cambios guardados correctamente.")
+            else:
+                messagebox.showerror("Error al guardar",
+                                     f"No se pudo escribir:\n{self.asignaciones.ruta}")
@@ -5,14 +5,17 @@ VentanaGestorAutomático: busca un artista, obtiene sus canciones únicas y gest
 Interfaz pulida: tema oscuro, estilo Spotify, grid adaptable y scroll total.
 """
 
-import time
-import unicodedata
-import re
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 from spotipy import Spotify
 
 import src.config as cfg
+from ..utils.limitador import FONDO, carril
+from ..utils.escritura import escribir_en_lotes
+from ..utils.discografia import RastreoCancelado, rastrear_discografia
+from ..utils.spotify_utils import agregar_canciones_a_playlist, iter_playlists_usuario
 
 
 class VentanaGestorAutomatico(tk.Toplevel):
@@ -42,6 +45,8 @@ class VentanaGestorAutomatico(tk.Toplevel):
         self.playlists: list[dict] = []
         self.artist_id: str = ""
         self.play_var = tk.StringVar(value="nueva")
+        # Rastreo en segundo plano: evento para cancelar el que esté en curso
+        self._cancelar_rastreo: threading.Event | None = None
 
         # Estilos
         style = ttk.Style(self)
@@ -147,6 +152,10 @@ class VentanaGestorAutomatico(tk.Toplevel):
         rpt.columnconfigure(0, weight=1)
         self.lbl_report = ttk.Label(rpt, text="No hay datos aún.", style="TLabel")
         self.lbl_report.grid(row=0, column=0, sticky="w")
+        self.btn_cancelar = ttk.Button(rpt, text="Cancelar", style="TButton",
+                                       command=self.cancelar_rastreo,
+                                       state=tk.DISABLED)
+        self.btn_cancelar.grid(row=0, column=1, sticky="e")
 
         # --- 3) Lista de canciones únicas --- #
         songs_f = ttk.LabelFrame(main, text="Canciones únicas encontradas",
@@ -224,105 +233,98 @@ class VentanaGestorAutomatico(tk.Toplevel):
             self.fetch_artist_songs()
 
     def fetch_artist_songs(self):
-        try:
-            self.songs = self.obtener_canciones_artista_completas(self.artist_id)
-            messagebox.showinfo("Info", f"Se encontraron {len(self.songs)} canciones únicas.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al obtener canciones:\n{e}")
-            return
+        """Lanza el rastreo en un hilo; las canciones llegan por una cola."""
+        self.cancelar_rastreo()
+        cancelar = threading.Event()
+        self._cancelar_rastreo = cancelar
+        cola: queue.Queue = queue.Queue()
+        artist_id = self.artist_id
+        self.songs = []
         self.tree_songs.delete(*self.tree_songs.get_children())
-        for s in self.songs:
-            self.tree_songs.insert("", "end", values=(s["name"],))
-        self.lbl_report.config(text=f"Total únicas: {len(self.songs)}")
-
-    def obtener_canciones_artista_completas(self, artist_id: str):
-        """Devuelve TODAS las canciones del artista sin duplicados “alternos”."""
-        MARKETS = ("US", "MX")
-        ALT_FLAGS = (
-            "acoustic", "live", "en vivo", "unplugged", "instrumental",
-            "remaster", "remastered", "demo", "karaoke", "edit",
-            "mix", "remix", "versión", "version", "session"
-        )
-        NOISE = ("feat.", "featuring", "ft.", "with", "con")
-        elegido: dict[str, dict] = {}
-        clean_punct = re.compile(r"[()\[\]{}\-–_:]")
-        total_raw = 0
-
-        def slug(txt: str) -> str:
-            txt = unicodedata.normalize("NFKD", txt).encode("ascii", "ignore").decode()
-            txt = txt.lower()
-            txt = clean_punct.sub(" ", txt)
-            for w in (*ALT_FLAGS, *NOISE):
-                txt = txt.replace(w, " ")
-            return " ".join(txt.split())
-
-        def es_alt(titulo: str, album: str) -> bool:
-            t, a = titulo.lower(), album.lower()
-            return any(w in t or w in a for w in ALT_FLAGS)
-
-        def considera(track: dict, album_name: str):
-            nonlocal total_raw
-            total_raw += 1
-            tid = track.get("id")
-            if not tid:
-                return
-            title = track.get("name", "").strip()
-            base = slug(title)
-            alt = es_alt(title, album_name)
-            if base not in elegido or (elegido[base]["alt"] and not alt):
-                elegido[base] = {"track": track, "alt": alt}
-
-        # 1) Álbumes / singles / compilados
-        try:
-            alb_resp = self.sp.artist_albums(
-                artist_id,
-                album_type="album,single,compilation,appears_on",
-                limit=50
-            )
-        except Exception:
-            return []
-        albums = []
+        self.lbl_report.config(text="Buscando canciones… 0 encontradas")
+        self.btn_cancelar.config(state=tk.NORMAL)
+        self._estado_acciones()
+
+        def trabajo():
+            try:
+                canciones = self.obtener_canciones_artista_completas(
+                    artist_id,
+                    on_canciones=lambda lista: cola.put(("lote", lista)),
+                    cancelar=cancelar,
+                )
+                cola.put(("fin", canciones))
+            except RastreoCancelado:
+                cola.put(("cancelado", None))
+            except Exception as e:
+                cola.put(("error", e))
+
+        threading.Thread(target=trabajo, daemon=True).start()
+        self._drenar_rastreo(cola, cancelar)
+
+    def _drenar_rastreo(self, cola: queue.Queue, cancelar: threading.Event):
+        if not self.winfo_exists():
+            cancelar.set()
+            return
+        if self._cancelar_rastreo not in (None, cancelar):
+            return      # ya hay otro rastreo en curso; este se descarta
+        lote, final = None, None
         while True:
-            albums += alb_resp.get("items", [])
-            if not alb_resp.get("next"):
+            try:
+                tipo, dato = cola.get_nowait()
+            except queue.Empty:
                 break
-            alb_resp = self.sp.next(alb_resp)
-
-        for alb in albums:
-            alb_name = alb.get("name", "")
-            for m in MARKETS:
-                try:
-                    tr_resp = self.sp.album_tracks(alb["id"], limit=50, market=m)
-                except Exception:
-                    continue
-                while True:
-                    for t in tr_resp.get("items", []):
-                        if any(a["id"] == artist_id for a in t["artists"]):
-                            considera(t, alb_name)
-                    if not tr_resp.get("next"):
-                        break
-                    tr_resp = self.sp.next(tr_resp)
-
-        # 2) Búsqueda global
-        try:
-            art_name = self.sp.artist(artist_id)["name"]
-            offset = 0
-            while True:
-                sr = self.sp.search(q=f'artist:"{art_name}"', type="track",
-                                    limit=50, offset=offset)
-                for t in sr["tracks"]["items"]:
-                    if any(a["id"] == artist_id for a in t["artists"]):
-                        considera(t, "")
-                if not sr["tracks"]["next"]:
-                    break
-                offset += 50
-        except Exception:
-            pass
+            if tipo == "lote":
+                lote = dato     # cada lote trae la lista completa
+            else:
+                final = (tipo, dato)
+                break
+        if lote is not None:
+            self._mostrar_canciones(lote)
+            self.lbl_report.config(text=f"Buscando canciones… {len(lote)} encontradas")
+        if final is None:
+            self.after(100, self._drenar_rastreo, cola, cancelar)
+            return
 
-        return [
-            {"id": d["track"]["id"], "name": d["track"]["name"]}
-            for d in elegido.values()
-        ]
+        tipo, dato = final
+        if self._cancelar_rastreo is cancelar:
+            self._cancelar_rastreo = None
+            self.btn_cancelar.config(state=tk.DISABLED)
+            self._estado_acciones()
+        if tipo == "fin":
+            self._mostrar_canciones(dato)
+            self.lbl_report.config(text=f"Total únicas: {len(self.songs)}")
+            messagebox.showinfo("Info", f"Se encontraron {len(self.songs)} canciones únicas.")
+        elif tipo == "cancelado":
+            self.lbl_report.config(text=f"Cancelado: {len(self.songs)} canciones hasta ahora")
+        else:
+            self.lbl_report.config(text=f"Error tras {len(self.songs)} canciones")
+            messagebox.showerror("Error", f"Error al obtener canciones:\n{dato}")
+
+    def _mostrar_canciones(self, canciones: list[dict]):
+        """Actualiza `tree_songs` en su sitio (iid = clave canónica)."""
+        nuevas = {s["clave"]: s for s in canciones}
+        for iid in self.tree_songs.get_children():
+            if iid not in nuevas:
+                self.tree_songs.delete(iid)
+        for clave, s in nuevas.items():
+            if self.tree_songs.exists(clave):
+                self.tree_songs.item(clave, values=(s["name"],))
+            else:
+                self.tree_songs.insert("", "end", iid=clave, values=(s["name"],))
+        self.songs = canciones
+
+    def cancelar_rastreo(self):
+        if self._cancelar_rastreo is not None:
+            self._cancelar_rastreo.set()
+            self._cancelar_rastreo = None
+        self.btn_cancelar.config(state=tk.DISABLED)
+        self._estado_acciones()
+
+    def obtener_canciones_artista_completas(self, artist_id: str, on_canciones=None, cancelar=None):
+        """Devuelve TODAS las canciones del artista sin duplicados “alternos”."""
+        # Rastreo masivo: cede el paso a las búsquedas interactivas
+        with carril(FONDO):
+            return rastrear_discografia(self.sp, artist_id, on_canciones, cancelar)
 
     def update_play_option(self):
         for w in self.dynamic.winfo_children():
@@ -332,9 +334,9 @@ class VentanaGestorAutomatico(tk.Toplevel):
                 .grid(row=0, column=0, sticky="w")
             self.new_name = ttk.Entry(self.dynamic, style="TEntry")
             self.new_name.grid(row=0, column=1, sticky="ew", padx=(5,0))
-            ttk.Button(self.dynamic, text="Crear & Agregar", style="TButton",
-                       command=self.crear_playlist_y_agregar_songs)\
-                .grid(row=1, column=0, columnspan=2, pady=5)
+            self.btn_accion = ttk.Button(self.dynamic, text="Crear & Agregar", style="TButton",
+                                         command=self.crear_playlist_y_agregar_songs)
+            self.btn_accion.grid(row=1, column=0, columnspan=2, pady=5)
         else:
             ttk.Label(self.dynamic, text="Buscar playlist:", style="TLabel")\
                 .grid(row=0, column=0, sticky="w")
@@ -352,11 +354,27 @@ class VentanaGestorAutomatico(tk.Toplevel):
             )
             self.pl_list.grid(row=1, column=0, columnspan=2, sticky="ew", pady=5)
             self.load_all_playlists()
-            ttk.Button(self.dynamic, text="Actualizar", style="TButton",
-                       command=self.actualizar_playlist_seleccionada)\
-                .grid(row=2, column=0, columnspan=2, pady=5)
+            self.btn_accion = ttk.Button(self.dynamic, text="Actualizar", style="TButton",
+                                         command=self.actualizar_playlist_seleccionada)
+            self.btn_accion.grid(row=2, column=0, columnspan=2, pady=5)
+        self._estado_acciones()
+
+    def _estado_acciones(self):
+        """Crear/Actualizar solo con la lista completa (sin rastreo en curso)."""
+        estado = tk.DISABLED if self._cancelar_rastreo is not None else tk.NORMAL
+        if getattr(self, "btn_accion", None) is not None and self.btn_accion.winfo_exists():
+            self.btn_accion.config(state=estado)
+
+    def _rastreo_en_curso(self) -> bool:
+        if self._cancelar_rastreo is None:
+            return False
+        messagebox.showinfo("Info", "Espera a que termine la búsqueda de canciones "
+                                    "o cancélala.")
+        return True
 
     def crear_playlist_y_agregar_songs(self):
+        if self._rastreo_en_curso():
+            return
         name = self.new_name.get().strip()
         if not name:
             messagebox.showinfo("Info", "Ingresa nombre.")
@@ -365,23 +383,22 @@ class VentanaGestorAutomatico(tk.Toplevel):
             self.user_id, name, public=True,
             description="Playlist generada automáticamente"
         )
-        ids = [s["id"] for s in self.songs]
-        for i in range(0, len(ids), 100):
-            self.sp.playlist_add_items(pl["id"], ids[i:i+100])
-            time.sleep(0.5)
+        uris = [f"spotify:track:{s['id']}" for s in self.songs]
+        res = escribir_en_lotes(self.sp, pl["id"], uris)
+        if res.fallidos:
+            messagebox.showwarning(
+                "Incompleto",
+                f"Playlist creada; faltan {res.fallidos} canciones. "
+                "Se reintentarán en la próxima escritura.")
+            return
         messagebox.showinfo("Listo", "Playlist creada y canciones agregadas.")
 
     def load_all_playlists(self):
         self.playlists.clear()
         self.pl_list.delete(0, tk.END)
-        res = self.sp.current_user_playlists(limit=50)
-        while True:
-            for p in res["items"]:
-                self.playlists.append(p)
-                self.pl_list.insert(tk.END, p["name"])
-            if not res.get("next"):
-                break
-            res = self.sp.next(res)
+        for p in iter_playlists_usuario(self.sp):
+            self.playlists.append(p)
+            self.pl_list.insert(tk.END, p["name"])
 
     def filtrar_playlists(self, _evt):
         term = self.search_pl.get().strip().lower()
@@ -391,22 +408,29 @@ class VentanaGestorAutomatico(tk.Toplevel):
                 self.pl_list.insert(tk.END, p["name"])
 
     def actualizar_playlist_seleccionada(self):
+        if self._rastreo_en_curso():
+            return
         sel = self.pl_list.curselection()
         if not sel:
             messagebox.showinfo("Info", "Selecciona playlist.")
             return
         pl = self.playlists[sel[0]]
-        existentes = {
-            item["track"]["id"]
-            for item in self.sp.playlist_items(pl["id"])["items"]
-        }
-        pendientes = [s["id"] for s in self.songs if s["id"] not in existentes]
-        for i in range(0, len(pendientes), 100):
-            self.sp.playlist_add_items(pl["id"], pendientes[i:i+100])
-            time.sleep(0.5)
-        messagebox.showinfo("Listo", "Playlist actualizada.")
+        # Diferencia contra la playlist COMPLETA (catálogo validado por
+        # snapshot_id): solo se escriben las canciones que faltan
+        res = agregar_canciones_a_playlist(self.sp, pl["id"], [s["id"] for s in self.songs])
+        if res.fallidos:
+            messagebox.showwarning(
+                "Incompleto",
+                f"Faltan {res.fallidos} canciones. "
+                "Se reintentarán en la próxima escritura.")
+            return
+        messagebox.showinfo(
+            "Listo",
+            f"Playlist actualizada: {res.agregados} agregadas, "
+            f"{res.omitidos} ya estaban.")
 
     def reset_to_artist_search(self):
+        self.cancelar_rastreo()
         self.songs.clear()
         self.artists_found.clear()
         self.lb_artists.delete(0, tk.END)
@@ -149,8 +149,11 @@ def ventana_agregar_artista_podcast(sp: Spotify, root: tk.Tk):
                 messagebox.showwarning("Info", "No se encontraron episodios.")
                 return
             from ..utils.spotify_utils import add_episodes_to_playlist as _add_eps
-            _add_eps(sp, pid, [f"spotify:episode:{e}" for e in eps])
-            messagebox.showinfo("Éxito", "Agregados episodios del podcast.")
+            res = _add_eps(sp, pid, [f"spotify:episode:{e}" for e in eps])
+            if res.fallidos:
+                messagebox.showwarning("Atención", f"{res.fallidos} episodios no se pudieron agregar.")
+            else:
+                messagebox.showinfo("Éxito", f"Agregados {res.agregados} episodios ({res.omitidos} ya estaban).")
         else:
             messagebox.showinfo("Atención", "No pusiste Artista ni Podcast.")
 
@@ -1,18 +1,17 @@
 # src/gui/podcasts.py
 
 """
-Ventana para sincronizar podcasts con sus playlists (data_podcasts).
+Ventana para sincronizar podcasts con sus playlists (data_podcasts.json).
 """
 
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 from spotipy import Spotify
-from ..utils.spotify_utils import (
-    get_podcast_episodes,
-    get_playlist_items,
-    add_episodes_to_playlist,
-)
-from ..data_podcasts import data_podcasts  # <-- ahora toma la lista externa
+from ..utils.sync_podcasts import sincronizar_pares
+from ..utils.asignaciones import cargar_asignaciones
+from ..config import logger
 
 def ventana_sincronizar_podcasts_data(sp: Spotify, root: tk.Tk):
     ven = tk.Toplevel(root)
@@ -23,58 +22,81 @@ def ventana_sincronizar_podcasts_data(sp: Spotify, root: tk.Tk):
              font=("Arial", 11)).pack(pady=8)
     prog = ttk.Progressbar(ven, orient="horizontal",
                            length=460, mode="determinate",
-                           maximum=len(data_podcasts))
+                           maximum=1)
     prog.pack(pady=5)
     lbl_estado = tk.Label(ven, text="Esperando…", anchor="w")
     lbl_estado.pack(fill=tk.X, padx=10)
     txt_log = tk.Text(ven, height=8, wrap=tk.WORD)
     txt_log.pack(padx=10, pady=6, fill=tk.BOTH, expand=True)
 
+    # Los hilos de trabajo solo escriben en la cola; el hilo Tk la drena.
+    cola: queue.Queue = queue.Queue()
+
     def log(msg: str):
         txt_log.insert(tk.END, msg + "\n")
         txt_log.see(tk.END)
-        ven.update_idletasks()
 
-    def sincronizar():
-        total = len(data_podcasts)
-        prog["value"] = 0
-        for idx, pair in enumerate(data_podcasts, start=1):
-            pod_id, pl_id = pair["podcast"], pair["playlist"]
-
-            # Intentamos obtener nombres para mostrar estado
-            try:
-                podcast_name = sp.show(pod_id, market="US")["name"]
-            except:
-                podcast_name = f"Podcast {pod_id[:8]}…"
+    def drenar():
+        if not ven.winfo_exists():
+            return
+        while True:
             try:
-                playlist_name = sp.playlist(pl_id, fields="name")["name"]
-            except:
-                playlist_name = f"Playlist {pl_id[:8]}…"
+                tipo, *datos = cola.get_nowait()
+            except queue.Empty:
+                break
+            if tipo == "log":
+                log(datos[0])
+            elif tipo == "progreso":
+                hechos, total, msg = datos
+                prog.config(maximum=total, value=hechos)
+                lbl_estado.config(text=f"{hechos}/{total}  {msg}")
+            elif tipo == "fin":
+                resumen = datos[0]
+                btn.config(state=tk.NORMAL)
+                if resumen["errores"]:
+                    lbl_estado.config(
+                        text=f"Sincronización con {resumen['errores']} errores "
+                             f"({resumen['segundos']} s)"
+                    )
+                    messagebox.showwarning(
+                        "Terminado con errores",
+                        f"{resumen['errores']} podcasts/playlists fallaron; "
+                        "revisa el registro y vuelve a sincronizar.",
+                    )
+                    return
+                lbl_estado.config(
+                    text=f"¡Sincronización completa! ({resumen['segundos']} s)"
+                )
+                messagebox.showinfo("Terminado", "Todos los podcasts han sido sincronizados.")
+                return
+            elif tipo == "error":
+                btn.config(state=tk.NORMAL)
+                lbl_estado.config(text="Sincronización abortada.")
+                log(f"❌ Sincronización abortada: {datos[0]}")
+                messagebox.showerror("Error", f"La sincronización falló:\n{datos[0]}")
+                return
+        ven.after(100, drenar)
 
-            lbl_estado.config(
-                text=f"{idx}/{total}  {podcast_name} → {playlist_name}"
+    def trabajo():
+        try:
+            resumen = sincronizar_pares(
+                sp, cargar_asignaciones(),
+                on_log=lambda m: cola.put(("log", m)),
+                on_progreso=lambda h, t, m: cola.put(("progreso", h, t, m)),
             )
-            ven.update_idletasks()
+        except Exception as e:
+            logger.error("Sincronización abortada: %s", e)
+            cola.put(("error", e))
+        else:
+            cola.put(("fin", resumen))
 
-            # Obtener episodios y agregarlos
-            eps = get_podcast_episodes(sp, pod_id)
-            if not eps:
-                log(f"❌ {podcast_name}: sin episodios o error.")
-                prog["value"] = idx
-                continue
-
-            antes = set(get_playlist_items(sp, pl_id))
-            add_episodes_to_playlist(sp, pl_id, eps)
-            despues = set(get_playlist_items(sp, pl_id))
-            nuevos = len(despues) - len(antes)
-            if nuevos:
-                log(f"✅ {podcast_name}: {nuevos} nuevos → {playlist_name}")
-            else:
-                log(f"• {podcast_name}: 0 nuevos")
-            prog["value"] = idx
-
-        lbl_estado.config(text="¡Sincronización completa!")
-        messagebox.showinfo("Terminado", "Todos los podcasts han sido sincronizados.")
+    def sincronizar():
+        prog["value"] = 0
+        btn.config(state=tk.DISABLED)
+        lbl_estado.config(text="Leyendo podcasts…")
+        threading.Thread(target=trabajo, daemon=True).start()
+        drenar()
 
-    tk.Button(ven, text="Iniciar sincronización", command=sincronizar) \
-        .pack(pady=6)
+    btn = tk.Button(ven, text="Iniciar sincronización", command=sincronizar)
+    btn.pack(pady=6)
+    return ven
@@ -5,7 +5,7 @@ Ventana de Búsqueda Avanzada: busca por frase o tema, filtra, y crea playlist.
 from __future__ import annotations
 import tkinter as tk
 from tkinter import ttk, messagebox
-import re, threading, queue, time, difflib
+import re, threading, queue, difflib
 from spotipy import Spotify
 
 def ventana_busqueda_avanzada(sp: Spotify, root: tk.Tk):
@@ -56,29 +56,18 @@ def ventana_busqueda_avanzada(sp: Spotify, root: tk.Tk):
         seeds_spotify = []
     artist_genres_cache: dict[str, list[str]] = {}
 
-    def call_safe(fn, *a, **k):
-        for i in range(3):
-            try:
-                return fn(*a, **k)
-            except Exception as e:
-                if "429" in str(e) or "rate" in str(e).lower():
-                    time.sleep(1.5 * (i+1))
-                else:
-                    raise
-        raise RuntimeError("Rate-limit continuo en Spotify")
-
     cola = queue.Queue()
     def _worker(params):
         texto_raw, generos_usr, seeds, lim, pop_min, texto_busq, use_pop, use_gen = params
         pistas = []
         if use_gen and seeds:
             try:
-                pistas = call_safe(sp.recommendations, seed_genres=seeds, limit=lim)["tracks"]
+                pistas = sp.recommendations(seed_genres=seeds, limit=lim)["tracks"]
             except:
                 pistas = []
         if len(pistas) < lim:
             try:
-                extra = call_safe(sp.search, q=texto_busq or texto_raw, type="track", limit=lim*2)["tracks"]["items"]
+                extra = sp.search(q=texto_busq or texto_raw, type="track", limit=lim*2)["tracks"]["items"]
                 pistas.extend(extra)
             except:
                 pass
@@ -91,7 +80,7 @@ def ventana_busqueda_avanzada(sp: Spotify, root: tk.Tk):
             faltantes = [i for p in pistas for i in [a["id"] for a in p["artists"]] if i not in artist_genres_cache]
             for lote in (faltantes[i:i+50] for i in range(0, len(faltantes), 50)):
                 try:
-                    arts = call_safe(sp.artists, lote)["artists"]
+                    arts = sp.artists(lote)["artists"]
                     for aobj in arts:
                         artist_genres_cache[aobj["id"]] = aobj.get("genres", [])
                 except:
@@ -7,6 +7,9 @@ import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 from spotipy import Spotify
 import time
+from ..utils.dedupe import Deduplicador
+from ..utils.spotify_utils import obtener_tracks
+from ..utils.discografia import CacheDiscografia, actualizar_lanzamientos
 
 def ventana_top_tracks(sp: Spotify, root: tk.Tk):
     ven = tk.Toplevel(root)
@@ -54,40 +57,31 @@ def ventana_top_tracks(sp: Spotify, root: tk.Tk):
             messagebox.showerror("Error", f"No pude buscar artista:\n{e}")
             return
 
-        # 2) Leer TODOS sus álbumes
-        album_ids = set(); offset = 0
-        while True:
-            resp = sp.artist_albums(art["id"], album_type="album,single,compilation,appears_on", limit=50, offset=offset, country="US")["items"]
-            if not resp: break
-            album_ids.update(alb["id"] for alb in resp)
-            offset += len(resp)
-
-        # 3) Sacar TODAS las pistas
-        raw_tracks = []
-        for alb_id in album_ids:
-            off2 = 0
-            while True:
-                items = sp.album_tracks(alb_id, limit=50, offset=off2)["items"]
-                if not items: break
-                raw_tracks.extend(items)
-                off2 += len(items)
-
-        if not raw_tracks:
+        # 2) Leer sus lanzamientos (solo los nuevos si ya estaba guardado),
+        # 3) sacar sus pistas (planificado, de 20 en 20) y 4) enriquecerlas
+        #    (popularidad, álbum, ISRC), una por grabación
+        dedupe = Deduplicador(sp, colapsar_alternas=False)
+        cache = CacheDiscografia(art["id"], country="US")
+        desde_disco = set(cache.grupos)
+        fresca = cache.fresca()
+        actualizar_lanzamientos(sp, cache, dedupe)
+        canonicas = dedupe.canonicas()
+        if not fresca:
+            # La popularidad guardada envejece con la entrada: al refrescar
+            # ésta, pedirla de nuevo (50 IDs por llamada) para las pistas que
+            # salieron del disco y no de este rastreo
+            viejas = {t["id"]: t for c, t in canonicas.items() if c in desde_disco}
+            for tid, det in obtener_tracks(sp, list(viejas)).items():
+                viejas[tid]["popularity"] = det.get("popularity", 0)
+            cache.guardar(dedupe)
+        uniq = list(canonicas.values())
+        for t in uniq:
+            t.setdefault("popularity", 0); t.setdefault("album", {})
+
+        if not uniq:
             messagebox.showinfo("Info","No hay pistas disponibles.")
             return
 
-        # 4) Añadir popularidad
-        seen = set(); uniq = []
-        for t in raw_tracks:
-            if t["id"] and t["id"] not in seen:
-                seen.add(t["id"]); uniq.append(t)
-        for i in range(0, len(uniq), 50):
-            batch = uniq[i:i+50]; ids = [t["id"] for t in batch]
-            details = sp.tracks(ids)["tracks"]
-            for det, orig in zip(details, batch):
-                orig["popularity"] = det.get("popularity",0)
-                orig["album"] = det.get("album",{})
-
         # 5) Filtros
         try: n = max(1,min(int(e_num.get()),50))
         except: n = 10
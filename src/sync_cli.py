@@ -0,0 +1,63 @@
+"""
+Sincronización de podcasts sin interfaz gráfica (cron / servidor).
+
+    python -m src.sync_cli                  # una corrida
+    python -m src.sync_cli --intervalo 3600 # cada hora, hasta Ctrl+C
+
+Cada corrida imprime en stdout una línea JSON con el resumen (conteos y
+tiempos); el log va a stderr. El código de salida es 1 si hubo errores.
+Requiere un token OAuth ya guardado en caché (autoriza una vez con la app).
+"""
+from __future__ import annotations
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+
+from .auth import get_spotify_client
+from .config import logger, SYNC_WORKERS
+from .utils.asignaciones import cargar_asignaciones
+from .utils.sync_podcasts import sincronizar_pares
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Sincroniza las asignaciones podcast → playlist sin Tk.")
+    ap.add_argument("--intervalo", type=float, default=0,
+                    help="segundos entre corridas (0 = una sola corrida)")
+    ap.add_argument("--workers", type=int, default=SYNC_WORKERS,
+                    help=f"hilos simultáneos (por defecto {SYNC_WORKERS})")
+    return ap.parse_args(argv)
+
+
+def correr_una_vez(sp, workers: int) -> dict:
+    inicio = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    pares = cargar_asignaciones()  # se relee en cada corrida
+    try:
+        resumen = sincronizar_pares(sp, pares, workers=workers,
+                                    on_log=lambda m: logger.info("%s", m))
+    except Exception as e:
+        logger.error("Sincronización abortada: %s", e)
+        resumen = {"pares": len(pares), "errores": 1, "error": str(e)}
+    resumen["inicio"] = inicio
+    if hasattr(sp, "estadisticas"):
+        resumen.update(sp.estadisticas())
+    print(json.dumps(resumen, ensure_ascii=False), flush=True)
+    return resumen
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    sp = get_spotify_client(open_browser=False)
+    try:
+        while True:
+            resumen = correr_una_vez(sp, args.workers)
+            if args.intervalo <= 0:
+                return 1 if resumen.get("errores") else 0
+            time.sleep(args.intervalo)
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Almacén de asignaciones podcast → playlist.
+
+Se guarda como JSON (`cfg.ASIGNACIONES_PATH`) con escritura atómica y se
+indexa en memoria en ambas direcciones, así que las búsquedas por podcast o
+por playlist y la detección de duplicados son O(1). Si el JSON no existe se
+migra el antiguo `data_podcasts.py` leyéndolo como literal (sin ejecutarlo).
+"""
+from __future__ import annotations
+import ast
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from ..config import logger, ASIGNACIONES_PATH
+from .persistencia import cargar_json, guardar_json
+
+def _leer_legado(ruta: Path) -> List[Dict[str, str]]:
+    """Lee `data_podcasts = [...]` de un .py generado, sin importarlo."""
+    try:
+        arbol = ast.parse(ruta.read_text(encoding="utf-8"))
+    except (OSError, SyntaxError) as e:
+        logger.error("No se pudo leer %s: %s", ruta, e)
+        return []
+    for nodo in arbol.body:
+        if isinstance(nodo, ast.Assign) and any(
+            getattr(t, "id", None) == "data_podcasts" for t in nodo.targets
+        ):
+            return ast.literal_eval(nodo.value)
+    return []
+
+
+class AlmacenAsignaciones:
+    """Pares {"podcast", "playlist"} indexados por podcast y por playlist."""
+
+    def __init__(self, ruta: Optional[Path] = None) -> None:
+        self.ruta = Path(ruta or ASIGNACIONES_PATH)
+        self._pares: Dict[tuple, None] = {}          # orden de inserción
+        self._por_podcast: Dict[str, Set[str]] = {}
+        self._por_playlist: Dict[str, Set[str]] = {}
+        self._sucio = False
+        self.cargar()
+
+    # --- carga / guardado ---
+    def cargar(self) -> None:
+        datos = cargar_json(self.ruta, None)
+        migrado = False
+        if datos is None:
+            legado = self.ruta.with_suffix(".py")
+            lista = _leer_legado(legado) if legado.exists() else []
+            migrado = bool(lista)
+        else:
+            lista = datos.get("asignaciones", [])
+        self._pares.clear()
+        self._por_podcast.clear()
+        self._por_playlist.clear()
+        for a in lista:
+            self._indexar(a["podcast"], a["playlist"])
+        self._sucio = migrado
+        if migrado:
+            self.guardar()
+
+    def guardar(self) -> bool:
+        """Escribe solo si hubo cambios. Devuelve False si la escritura falló."""
+        if not self._sucio:
+            return True
+        try:
+            guardar_json(self.ruta, {"asignaciones": self.como_lista()})
+        except OSError as e:
+            logger.error("No se pudo guardar %s: %s", self.ruta, e)
+            return False
+        self._sucio = False
+        return True
+
+    # --- consultas ---
+    def existe(self, podcast: str, playlist: str) -> bool:
+        return (podcast, playlist) in self._pares
+
+    def playlists_de(self, podcast: str) -> Set[str]:
+        return set(self._por_podcast.get(podcast, ()))
+
+    def podcasts_de(self, playlist: str) -> Set[str]:
+        return set(self._por_playlist.get(playlist, ()))
+
+    def como_lista(self) -> List[Dict[str, str]]:
+        return [{"podcast": p, "playlist": pl} for p, pl in self._pares]
+
+    def __len__(self) -> int:
+        return len(self._pares)
+
+    # --- cambios ---
+    def agregar(self, podcast: str, playlist: str) -> bool:
+        """Agrega el par; False si ya existía."""
+        if self.existe(podcast, playlist):
+            return False
+        self._indexar(podcast, playlist)
+        self._sucio = True
+        return True
+
+    def eliminar(self, podcast: str, playlist: str) -> bool:
+        """Quita el par; False si no existía."""
+        if not self.existe(podcast, playlist):
+            return False
+        del self._pares[(podcast, playlist)]
+        self._por_podcast[podcast].discard(playlist)
+        self._por_playlist[playlist].discard(podcast)
+        self._sucio = True
+        return True
+
+    def _indexar(self, podcast: str, playlist: str) -> None:
+        self._pares[(podcast, playlist)] = None
+        self._por_podcast.setdefault(podcast, set()).add(playlist)
+        self._por_playlist.setdefault(playlist, set()).add(podcast)
+
+
+def cargar_asignaciones() -> List[Dict[str, str]]:
+    """Lista de pares {"podcast", "playlist"} para sincronizar."""
+    return AlmacenAsignaciones().como_lista()
@@ -0,0 +1,211 @@
+"""
+Caché HTTP persistente para las lecturas de la API de Spotify.
+
+Es un `HTTPAdapter` que se monta en la sesión del cliente (ver
+`transporte.crear_sesion`), así que spotipy no se entera:
+- cada GET cacheable se guarda en SQLite (`cfg.DATA_DIR/http_cache.sqlite`)
+  junto con su ETag;
+- mientras la entrada está dentro del TTL de su endpoint se responde desde
+  disco; pasado el TTL se revalida con `If-None-Match` y un 304 reutiliza el
+  cuerpo guardado;
+- el tamaño total está acotado y se expulsa lo menos usado (LRU);
+- toda escritura (POST/PUT/DELETE) sobre una playlist invalida sus entradas y
+  el listado de playlists del usuario.
+"""
+from __future__ import annotations
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from ..config import logger, DATA_DIR
+
+API = "https://api.spotify.com/v1"
+_DIA = 24 * 3600
+
+# (patrón de la ruta, TTL en segundos). 0 = revalidar siempre con ETag.
+# Lo que no aparece (búsquedas, /me, recomendaciones…) no se cachea.
+TTLS: List[Tuple[re.Pattern, int]] = [
+    (re.compile(r"^/v1/playlists/[^/]+(/tracks)?$"), 0),
+    (re.compile(r"^/v1/me/playlists$"), 0),
+    (re.compile(r"^/v1/me/shows$"), 0),
+    (re.compile(r"^/v1/shows(/[^/]+(/episodes)?)?$"), 0),
+    # Álbumes y sus pistas no cambian: TTL largo sin revalidar
+    (re.compile(r"^/v1/albums(/[^/]+(/tracks)?)?$"), 7 * _DIA),
+    # Pistas y artistas traen campos mutables (popularity, genres) con los que
+    # se filtra y ordena; igual que los lanzamientos y el top, siempre revalidar
+    (re.compile(r"^/v1/tracks(/[^/]+)?$"), 0),
+    (re.compile(r"^/v1/artists(/[^/]+)?$"), 0),
+    (re.compile(r"^/v1/artists/[^/]+/(albums|top-tracks)$"), 0),
+]
+_PLAYLIST = re.compile(r"^/v1/playlists/([^/?]+)")
+_RUTA = re.compile(r"^https?://[^/]+(/[^?]*)")
+
+
+def ttl_para(url: str) -> Optional[int]:
+    m = _RUTA.match(url)
+    ruta = m.group(1) if m else ""
+    for patron, ttl in TTLS:
+        if patron.match(ruta):
+            return ttl
+    return None
+
+
+class AlmacenCache:
+    """Entradas {url: (etag, tipo, cuerpo)} en SQLite con expulsión LRU."""
+
+    def __init__(self, ruta: Path, max_bytes: int) -> None:
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(ruta), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entradas ("
+            " url TEXT PRIMARY KEY, etag TEXT, tipo TEXT, cuerpo BLOB,"
+            " tam INTEGER, guardado REAL, usado REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_usado ON entradas(usado)")
+        self._db.commit()
+        self._total = self._db.execute(
+            "SELECT COALESCE(SUM(tam), 0) FROM entradas").fetchone()[0]
+
+    def leer(self, url: str) -> Optional[tuple]:
+        """(etag, tipo, cuerpo, guardado) y marca la entrada como usada."""
+        with self._lock:
+            fila = self._db.execute(
+                "SELECT etag, tipo, cuerpo, guardado FROM entradas WHERE url = ?",
+                (url,)).fetchone()
+            if fila:
+                self._db.execute("UPDATE entradas SET usado = ? WHERE url = ?",
+                                 (time.time(), url))
+                self._db.commit()
+            return fila
+
+    def refrescar(self, url: str) -> None:
+        with self._lock:
+            ahora = time.time()
+            self._db.execute("UPDATE entradas SET guardado = ?, usado = ? WHERE url = ?",
+                             (ahora, ahora, url))
+            self._db.commit()
+
+    def guardar(self, url: str, etag: Optional[str], tipo: str, cuerpo: bytes) -> None:
+        tam = len(cuerpo)
+        if tam > self.max_bytes // 4:
+            return  # una sola respuesta no debe vaciar la caché
+        with self._lock:
+            previo = self._db.execute("SELECT tam FROM entradas WHERE url = ?",
+                                      (url,)).fetchone()
+            ahora = time.time()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entradas VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, tipo, cuerpo, tam, ahora, ahora))
+            self._total += tam - (previo[0] if previo else 0)
+            if self._total > self.max_bytes:
+                self._expulsar()
+            self._db.commit()
+
+    def _expulsar(self) -> None:
+        """Borra lo menos usado hasta quedar al 80 % del máximo."""
+        objetivo = self.max_bytes * 0.8
+        for url, tam in self._db.execute(
+                "SELECT url, tam FROM entradas ORDER BY usado").fetchall():
+            if self._total <= objetivo:
+                break
+            self._db.execute("DELETE FROM entradas WHERE url = ?", (url,))
+            self._total -= tam
+
+    def invalidar(self, prefijo: str) -> None:
+        """Borra todas las entradas cuya URL empieza con `prefijo`."""
+        with self._lock:
+            patron = prefijo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            self._db.execute("DELETE FROM entradas WHERE url LIKE ? ESCAPE '\\'",
+                             (patron + "%",))
+            self._total = self._db.execute(
+                "SELECT COALESCE(SUM(tam), 0) FROM entradas").fetchone()[0]
+            self._db.commit()
+
+
+class AdaptadorCache(HTTPAdapter):
+    """HTTPAdapter con caché condicional (ETag) para los GET de la API."""
+
+    def __init__(self, almacen: AlmacenCache, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.almacen = almacen
+        self.stats: Dict[str, int] = {"aciertos": 0, "revalidadas": 0, "fallos": 0}
+
+    def send(self, request, **kwargs):
+        if request.method != "GET":
+            resp = super().send(request, **kwargs)
+            self._invalidar_por_escritura(request.url)
+            return resp
+
+        ttl = ttl_para(request.url)
+        if ttl is None:
+            return super().send(request, **kwargs)
+
+        entrada = self.almacen.leer(request.url)
+        if entrada:
+            etag, tipo, cuerpo, guardado = entrada
+            if time.time() - guardado < ttl:
+                self.stats["aciertos"] += 1
+                return self._respuesta(request, tipo, cuerpo, etag)
+            if etag:
+                request.headers["If-None-Match"] = etag
+
+        resp = super().send(request, **kwargs)
+        if resp.status_code == 304 and entrada:
+            resp.close()
+            self.almacen.refrescar(request.url)
+            self.stats["revalidadas"] += 1
+            return self._respuesta(request, entrada[1], entrada[2], entrada[0])
+
+        self.stats["fallos"] += 1
+        etag = resp.headers.get("ETag")
+        if resp.status_code == 200 and (etag or ttl > 0):
+            self.almacen.guardar(request.url, etag,
+                                 resp.headers.get("Content-Type", "application/json"),
+                                 resp.content)
+        return resp
+
+    def _invalidar_por_escritura(self, url: str) -> None:
+        m = _RUTA.match(url)
+        if not m:
+            return
+        ruta, base = m.group(1), url[:m.start(1)] + "/v1"
+        pl = _PLAYLIST.match(ruta)
+        if pl:
+            self.invalidar_playlist(pl.group(1), base)
+        elif ruta.startswith("/v1/users/") and ruta.endswith("/playlists"):
+            self.almacen.invalidar(f"{base}/me/playlists")
+
+    def invalidar_playlist(self, playlist_id: str, base: str = API) -> None:
+        """Tras escribir en una playlist: su contenido y el listado del usuario."""
+        self.almacen.invalidar(f"{base}/playlists/{playlist_id}")
+        self.almacen.invalidar(f"{base}/me/playlists")
+
+    @staticmethod
+    def _respuesta(request, tipo: str, cuerpo: bytes, etag: Optional[str]) -> Response:
+        resp = Response()
+        resp.status_code = 200
+        resp.reason = "OK"
+        resp._content = cuerpo
+        resp.headers = CaseInsensitiveDict({"Content-Type": tipo})
+        if etag:
+            resp.headers["ETag"] = etag
+        resp.encoding = "utf-8"
+        resp.url = request.url
+        resp.request = request
+        resp.from_cache = True
+        return resp
+
+
+def crear_adaptador_cache(max_mb: int, **kwargs) -> AdaptadorCache:
+    almacen = AlmacenCache(DATA_DIR / "http_cache.sqlite", max_mb * 1024 * 1024)
+    logger.debug("Caché HTTP: %s MB en %s", max_mb, DATA_DIR)
+    return AdaptadorCache(almacen, **kwargs)
@@ -0,0 +1,136 @@
+"""
+Catálogo local (SQLite) de playlists y su contenido, validado por snapshot_id.
+
+Spotify cambia el `snapshot_id` de una playlist con cada modificación, así que
+si el snapshot actual coincide con el guardado, los items guardados siguen
+siendo válidos y no hace falta volver a descargarlos.
+
+Cada playlist guarda además si su contenido está `completo` (URI + nombre +
+artista) o solo con URIs (p. ej. tras anexar lo que escribimos nosotros);
+quien necesite nombres debe pedir `completo=True`.
+"""
+from __future__ import annotations
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from ..config import DATA_DIR
+
+# (uri, id, nombre, artista/show)
+Fila = Tuple[str, Optional[str], Optional[str], Optional[str]]
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS playlists (
+    id TEXT PRIMARY KEY, nombre TEXT, total INTEGER,
+    snapshot_id TEXT,          -- último visto en Spotify
+    items_snapshot TEXT,       -- snapshot al que corresponden los items
+    completo INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS items (
+    playlist_id TEXT, pos INTEGER, uri TEXT, id TEXT, nombre TEXT, artista TEXT,
+    PRIMARY KEY (playlist_id, pos)
+);
+"""
+
+
+class CatalogoPlaylists:
+    def __init__(self, ruta: Path) -> None:
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(ruta), check_same_thread=False)
+        self._db.executescript(_ESQUEMA)
+        self._db.commit()
+
+    def registrar_listado(self, filas: Iterable[Tuple[str, str, int, Optional[str]]]) -> None:
+        """Guarda (id, nombre, total, snapshot_id) de un listado de playlists."""
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO playlists (id, nombre, total, snapshot_id) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET nombre = excluded.nombre, "
+                "total = excluded.total, snapshot_id = excluded.snapshot_id",
+                list(filas))
+            self._db.commit()
+
+    def items(self, playlist_id: str, snapshot_id: Optional[str],
+              completo: bool = False) -> Optional[List[Fila]]:
+        """Items guardados si corresponden a `snapshot_id`; None si hay que descargar."""
+        if not snapshot_id:
+            return None
+        with self._lock:
+            fila = self._db.execute(
+                "SELECT items_snapshot, completo FROM playlists WHERE id = ?",
+                (playlist_id,)).fetchone()
+            if not fila or fila[0] != snapshot_id or (completo and not fila[1]):
+                return None
+            return self._db.execute(
+                "SELECT uri, id, nombre, artista FROM items "
+                "WHERE playlist_id = ? ORDER BY pos", (playlist_id,)).fetchall()
+
+    def guardar_items(self, playlist_id: str, snapshot_id: Optional[str],
+                      filas: List[Fila], completo: bool = True) -> None:
+        """Reemplaza el contenido guardado de la playlist."""
+        if not snapshot_id:
+            return
+        with self._lock:
+            self._db.execute("DELETE FROM items WHERE playlist_id = ?", (playlist_id,))
+            self._db.executemany(
+                "INSERT INTO items VALUES (?, ?, ?, ?, ?, ?)",
+                [(playlist_id, i, *f) for i, f in enumerate(filas)])
+            self._actualizar(playlist_id, snapshot_id, len(filas), completo)
+            self._db.commit()
+
+    def anexar(self, playlist_id: str, snapshot_previo: Optional[str],
+               snapshot_nuevo: Optional[str], uris: List[str]) -> bool:
+        """
+        Registra items que acabamos de agregar al final de la playlist, pasando
+        de `snapshot_previo` a `snapshot_nuevo` sin volver a leerla. Si lo
+        guardado no correspondía a `snapshot_previo`, no hace nada. Los items
+        anexados no traen nombre: la playlist queda como no `completo`.
+        """
+        if not snapshot_previo or not snapshot_nuevo:
+            return False
+        with self._lock:
+            fila = self._db.execute(
+                "SELECT items_snapshot FROM playlists WHERE id = ?",
+                (playlist_id,)).fetchone()
+            if not fila or fila[0] != snapshot_previo:
+                return False
+            base = self._db.execute(
+                "SELECT COUNT(*) FROM items WHERE playlist_id = ?",
+                (playlist_id,)).fetchone()[0]
+            self._db.executemany(
+                "INSERT INTO items VALUES (?, ?, ?, ?, ?, ?)",
+                [(playlist_id, base + i, u, u.rsplit(":", 1)[-1], None, None)
+                 for i, u in enumerate(uris)])
+            self._actualizar(playlist_id, snapshot_nuevo, base + len(uris), False)
+            self._db.commit()
+            return True
+
+    def items_snapshot(self, playlist_id: str) -> Optional[str]:
+        with self._lock:
+            fila = self._db.execute(
+                "SELECT items_snapshot FROM playlists WHERE id = ?",
+                (playlist_id,)).fetchone()
+        return fila[0] if fila else None
+
+    def _actualizar(self, playlist_id: str, snapshot_id: str, total: int, completo: bool) -> None:
+        self._db.execute(
+            "INSERT INTO playlists (id, total, snapshot_id, items_snapshot, completo) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+            "total = excluded.total, snapshot_id = excluded.snapshot_id, "
+            "items_snapshot = excluded.items_snapshot, completo = excluded.completo",
+            (playlist_id, total, snapshot_id, snapshot_id, int(completo)))
+
+
+_catalogo: Optional[CatalogoPlaylists] = None
+_catalogo_lock = threading.Lock()
+
+
+def catalogo() -> CatalogoPlaylists:
+    """Instancia compartida (se abre al primer uso)."""
+    global _catalogo
+    with _catalogo_lock:
+        if _catalogo is None:
+            _catalogo = CatalogoPlaylists(DATA_DIR / "catalogo.sqlite")
+        return _catalogo
@@ -0,0 +1,174 @@
+"""
+Deduplicación de canciones por grabación (ISRC).
+
+Las pistas candidatas se enriquecen con `sp.tracks` (50 IDs por llamada) para
+obtener su ISRC: la misma grabación publicada en varios álbumes comparte ISRC
+y queda en un solo grupo, mientras que grabaciones distintas con el mismo
+título se mantienen separadas. Solo las pistas sin ISRC caen al título
+normalizado (una única regex precompilada).
+
+Con `colapsar_alternas` las versiones "alternas" (live, remix, acústica…) se
+ocultan si existe una versión normal con el mismo título normalizado; si no
+la hay, queda una sola alterna por título.
+"""
+from __future__ import annotations
+import re
+import unicodedata
+from typing import Callable, Dict, List, Optional
+
+from spotipy import Spotify
+
+from .spotify_utils import obtener_tracks
+
+ALT_FLAGS = (
+    "acoustic", "live", "en vivo", "unplugged", "instrumental",
+    "remaster", "remastered", "demo", "karaoke", "edit",
+    "mix", "remix", "versión", "version", "session"
+)
+NOISE = ("feat", "featuring", "ft", "with", "con")
+LOTE_ENRIQUECER = 200
+
+
+def _ascii(txt: str) -> str:
+    return unicodedata.normalize("NFKD", txt).encode("ascii", "ignore").decode().lower()
+
+
+def _alternativa(palabras) -> str:
+    return "|".join(sorted({re.escape(_ascii(w)) for w in palabras}, key=len, reverse=True))
+
+
+_RE_SLUG = re.compile(r"\b(?:%s)\b|[^a-z0-9 ]+" % _alternativa((*ALT_FLAGS, *NOISE)))
+_RE_ALT = re.compile(r"\b(?:%s)\b" % _alternativa(ALT_FLAGS))
+
+
+def slug(txt: str) -> str:
+    """Título sin acentos, puntuación, marcas de versión ni colaboraciones."""
+    return " ".join(_RE_SLUG.sub(" ", _ascii(txt)).split())
+
+
+def es_alt(titulo: str, album: str) -> bool:
+    return bool(_RE_ALT.search(_ascii(titulo)) or _RE_ALT.search(_ascii(album)))
+
+
+def isrc(track: dict) -> Optional[str]:
+    return ((track.get("external_ids") or {}).get("isrc") or "").upper() or None
+
+
+def recortar(track: dict) -> dict:
+    """Solo los campos que usan las ventanas (para guardar en disco)."""
+    album = track.get("album") or {}
+    return {
+        "id": track.get("id"),
+        "name": track.get("name"),
+        "uri": track.get("uri"),
+        "popularity": track.get("popularity"),
+        "duration_ms": track.get("duration_ms"),
+        "external_ids": track.get("external_ids") or {},
+        "artists": [{"id": a.get("id"), "name": a.get("name")}
+                    for a in track.get("artists") or []],
+        "album": {k: album.get(k) for k in ("id", "name", "album_type", "release_date")},
+    }
+
+
+class Deduplicador:
+    """
+    Agrupa pistas a medida que llegan (`agregar`) y entrega una canónica por
+    grupo (`canonicas`). El enriquecimiento se hace por bloques de
+    `LOTE_ENRIQUECER` pistas; `vaciar` fuerza el bloque pendiente. Tras cada
+    bloque se llama `on_lote()` (para mostrar avance o cancelar lanzando una
+    excepción).
+    """
+
+    def __init__(
+        self,
+        sp: Spotify,
+        colapsar_alternas: bool = True,
+        on_lote: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.sp = sp
+        self.colapsar_alternas = colapsar_alternas
+        self.on_lote = on_lote
+        self.total_candidatas = 0
+        self._pendientes: List[tuple] = []
+        self._vistos: set = set()
+        # clave → {"track", "alt", "slug", "puntos"}
+        self._grupos: Dict[str, dict] = {}
+
+    def agregar(self, track: dict, album: Optional[str] = None) -> None:
+        """Candidata; `album` es el nombre del lanzamiento donde apareció."""
+        tid = track.get("id")
+        if not tid or tid in self._vistos:
+            return
+        self._vistos.add(tid)
+        self.total_candidatas += 1
+        self._pendientes.append((track, album))
+        if len(self._pendientes) >= LOTE_ENRIQUECER:
+            self.vaciar()
+
+    def vaciar(self) -> None:
+        if not self._pendientes:
+            return
+        pendientes, self._pendientes = self._pendientes, []
+        faltan = [t["id"] for t, _ in pendientes if "external_ids" not in t]
+        completas = obtener_tracks(self.sp, faltan) if faltan else {}
+        for track, album in pendientes:
+            track = completas.get(track["id"], track)
+            self._agrupar(track, album)
+        if self.on_lote:
+            self.on_lote()
+
+    def _agrupar(self, track: dict, album: Optional[str]) -> None:
+        if album is None:
+            album = (track.get("album") or {}).get("name", "")
+        titulo = track.get("name", "").strip()
+        base = slug(titulo)
+        alt = es_alt(titulo, album)
+        codigo = isrc(track)
+        clave = f"isrc:{codigo}" if codigo else f"slug:{base}" + ("|alt" if alt else "")
+        puntos = (not alt,
+                  (track.get("album") or {}).get("album_type") == "album",
+                  track.get("popularity") or 0)
+        actual = self._grupos.get(clave)
+        if actual is None or puntos > actual["puntos"]:
+            self._grupos[clave] = {"track": track, "alt": alt, "slug": base,
+                                   "puntos": puntos}
+
+    def exportar(self) -> Dict[str, dict]:
+        """Grupos serializables (pistas recortadas) para `importar` después."""
+        self.vaciar()
+        return {c: {"track": recortar(g["track"]), "alt": g["alt"],
+                    "slug": g["slug"], "puntos": list(g["puntos"])}
+                for c, g in self._grupos.items()}
+
+    def importar(self, grupos: Dict[str, dict]) -> None:
+        for clave, g in grupos.items():
+            self._grupos[clave] = dict(g, puntos=tuple(g["puntos"]))
+            self._vistos.add(g["track"]["id"])
+        if grupos and self.on_lote:
+            self.on_lote()
+
+    def claves_canonicas(self) -> set:
+        """
+        Claves de `canonicas()` (alternas colapsadas incluidas). Vacía lo
+        pendiente, así que puede hacer llamadas a la API.
+        """
+        return set(self.canonicas())
+
+    def canonicas(self) -> Dict[str, dict]:
+        """{clave canónica: pista} sin duplicados (ni alternas, si se pidió)."""
+        self.vaciar()
+        if not self.colapsar_alternas:
+            return {c: g["track"] for c, g in self._grupos.items()}
+        normales = {g["slug"] for g in self._grupos.values() if not g["alt"]}
+        # Sin versión normal, queda una sola alterna por título (la mejor)
+        mejor_alt: Dict[str, str] = {}
+        for c, g in self._grupos.items():
+            if g["alt"] and g["slug"] not in normales:
+                actual = mejor_alt.get(g["slug"])
+                if actual is None or g["puntos"] > self._grupos[actual]["puntos"]:
+                    mejor_alt[g["slug"]] = c
+        elegidas = set(mejor_alt.values())
+        return {
+            c: g["track"] for c, g in self._grupos.items()
+            if not g["alt"] or c in elegidas
+        }
@@ -0,0 +1,284 @@
+"""
+Rastreo de la discografía completa de un artista (gestor automático):
+lanzamientos hidratados por lotes, búsqueda global de sueltas y caché por
+artista; los duplicados se resuelven con `dedupe.py`.
+"""
+from __future__ import annotations
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from spotipy import Spotify
+
+from ..config import logger, DATA_DIR, DISCOGRAFIA_TTL
+from .dedupe import Deduplicador, slug
+from .persistencia import cargar_json, guardar_json
+from .spotify_utils import iter_albumes_artista, iter_albumes_completos, obtener_tracks
+
+DISCOGRAFIAS_DIR = DATA_DIR / "discografias"
+GRUPOS_ALBUMES = "album,single,compilation,appears_on"
+MARKETS = ("US", "MX")
+RANGO_GRUPO = {"album": 0, "single": 1, "compilation": 2, "appears_on": 3}
+RONDAS_SIN_NOVEDAD = 2
+PAGINAS_SIN_NOVEDAD = 2
+MAX_BUSQUEDA = 1000            # offset máximo que acepta /search
+LOTE_COLA = 20
+_RE_REEDICION = re.compile(
+    r"\b(?:deluxe|edition|edicion|expanded|anniversary|bonus|special|"
+    r"especial|platinum|complete|reissue|aniversario|\d+(?:st|nd|rd|th))\b"
+)
+
+
+class RastreoCancelado(Exception):
+    """El usuario canceló el rastreo en curso."""
+
+
+def nombre_base(nombre: str) -> str:
+    """Nombre del lanzamiento sin marcas de reedición (deluxe, aniversario…)."""
+    return " ".join(_RE_REEDICION.sub(" ", slug(nombre)).split())
+
+
+def planificar(lanzamientos: Iterable[dict]) -> Tuple[List[dict], List[dict]]:
+    """
+    (núcleo, cola). El núcleo son álbumes y singles cuyo nombre base no se vio
+    antes (del más antiguo al más nuevo) y se lee completo; la cola, el resto
+    (reediciones, compilados, apariciones), primero los grupos propios y,
+    dentro de cada grupo, los de más pistas.
+    """
+    def rango(alb: dict) -> int:
+        return RANGO_GRUPO.get(alb.get("album_group") or alb.get("album_type"), 3)
+
+    nucleo: List[dict] = []
+    cola: List[dict] = []
+    bases: set = set()
+    for alb in sorted(lanzamientos, key=lambda a: (rango(a), a.get("release_date") or "")):
+        base = nombre_base(alb.get("name", ""))
+        if rango(alb) <= RANGO_GRUPO["single"] and base not in bases:
+            nucleo.append(alb)
+        else:
+            cola.append(alb)
+        bases.add(base)
+    cola.sort(key=lambda a: (rango(a), -(a.get("total_tracks") or 0)))
+    return nucleo, cola
+
+
+def disponibilidad_dudosa(track: dict) -> bool:
+    """True si la pista no declara estar disponible en ninguno de `MARKETS`."""
+    mercados = track.get("available_markets")
+    return mercados is not None and not any(m in mercados for m in MARKETS)
+
+
+def _resolver_mercados(sp: Spotify, dudosas: Dict[str, tuple]) -> Dict[str, tuple]:
+    """
+    Para cada {track_id: (track, álbum)} dudosa, la versión reproducible en el
+    primer mercado de `MARKETS` que la tenga; si ninguno, la original.
+    """
+    resueltas: Dict[str, tuple] = {}
+    for m in MARKETS:
+        faltan = [tid for tid in dudosas if tid not in resueltas]
+        if not faltan:
+            break
+        for tid, det in obtener_tracks(sp, faltan, market=m).items():
+            if det.get("is_playable"):
+                resueltas[tid] = (det, dudosas[tid][1])
+    return {tid: resueltas.get(tid, par) for tid, par in dudosas.items()}
+
+
+def _hidratar(sp: Spotify, artist_id: str, album_ids: List[str], dedupe: Deduplicador) -> None:
+    """
+    Pistas del artista en `album_ids` → `dedupe`. Una sola pasada sin
+    mercado; solo las pistas sin disponibilidad en `MARKETS` se consultan
+    por mercado para recoger la versión relinkeada.
+    """
+    dudosas: Dict[str, tuple] = {}
+    for alb in iter_albumes_completos(sp, album_ids):
+        alb_name = alb.get("name", "")
+        for t in alb["tracks"]["items"]:
+            if not any(a["id"] == artist_id for a in t["artists"]):
+                continue
+            if disponibilidad_dudosa(t) and t.get("id"):
+                dudosas[t["id"]] = (t, alb_name)
+            else:
+                dedupe.agregar(t, alb_name)
+    # Solo las pistas sin disponibilidad clara se consultan por mercado
+    for t, alb_name in _resolver_mercados(sp, dudosas).values():
+        dedupe.agregar(t, alb_name)
+
+
+def leer_lanzamientos(
+    sp: Spotify, artist_id: str, lanzamientos: Iterable[dict], dedupe: Deduplicador
+) -> Dict[str, int]:
+    """
+    Hidrata los lanzamientos según `planificar` y vuelca las pistas del
+    artista en `dedupe`: el núcleo entero y la cola de 20 en 20 hasta
+    `RONDAS_SIN_NOVEDAD` lotes seguidos sin canciones canónicas nuevas.
+    Devuelve {"lanzamientos", "leidos", "omitidos"}.
+    """
+    unicos = {a["id"]: a for a in lanzamientos}
+    nucleo, cola = planificar(unicos.values())
+    _hidratar(sp, artist_id, [a["id"] for a in nucleo], dedupe)
+    leidos = len(nucleo)
+
+    sin_novedad = 0
+    for i in range(0, len(cola), LOTE_COLA):
+        if sin_novedad >= RONDAS_SIN_NOVEDAD:
+            break
+        antes = dedupe.claves_canonicas()
+        lote = cola[i:i + LOTE_COLA]
+        _hidratar(sp, artist_id, [a["id"] for a in lote], dedupe)
+        leidos += len(lote)
+        sin_novedad = 0 if dedupe.claves_canonicas() - antes else sin_novedad + 1
+
+    stats = {"lanzamientos": len(unicos), "leidos": leidos,
+             "omitidos": len(unicos) - leidos}
+    logger.info("Discografía de %s: %s", artist_id, stats)
+    return stats
+
+
+class CacheDiscografia:
+    """
+    Discografía guardada de un artista (por mercado de listado, si hay) en
+    `DISCOGRAFIAS_DIR`: lanzamientos conocidos y grupos del deduplicador.
+    Dentro de `DISCOGRAFIA_TTL` se usa tal cual; después basta la primera
+    página del listado para ver si hay lanzamientos nuevos.
+    """
+
+    def __init__(self, artist_id: str, country: Optional[str] = None) -> None:
+        self.artist_id = artist_id
+        self.country = country
+        nombre = f"{artist_id}-{country}" if country else artist_id
+        self.ruta = DISCOGRAFIAS_DIR / f"{nombre}.json"
+        datos = cargar_json(self.ruta, {})
+        self.fecha: float = datos.get("fecha", 0)
+        self.total: Optional[int] = datos.get("total")
+        self.lanzamientos: set = set(datos.get("lanzamientos", []))
+        self.grupos: Dict[str, dict] = datos.get("grupos", {})
+        self.extra: Dict[str, object] = datos.get("extra", {})
+
+    def fresca(self) -> bool:
+        return bool(self.grupos) and time.time() - self.fecha < DISCOGRAFIA_TTL
+
+    def sin_novedades(self, sp: Spotify) -> bool:
+        """Una llamada: ¿sigue igual el total y la primera página es conocida?"""
+        if self.total is None:
+            return False
+        pagina = sp.artist_albums(self.artist_id, album_type=GRUPOS_ALBUMES,
+                                  country=self.country, limit=50)
+        return (pagina.get("total") == self.total
+                and all(a["id"] in self.lanzamientos for a in pagina.get("items") or []))
+
+    def guardar(self, dedupe: Deduplicador) -> None:
+        self.fecha = time.time()
+        guardar_json(self.ruta, {
+            "fecha": self.fecha,
+            "total": self.total,
+            "lanzamientos": sorted(self.lanzamientos),
+            "grupos": dedupe.exportar(),
+            "extra": self.extra,
+        })
+
+
+def actualizar_lanzamientos(
+    sp: Spotify, cache: CacheDiscografia, dedupe: Deduplicador
+) -> Optional[Dict[str, int]]:
+    """
+    Carga en `dedupe` lo guardado e hidrata solo lanzamientos nuevos.
+    Devuelve las estadísticas de `leer_lanzamientos`, o None si no hizo
+    falta leer nada (caché fresca o sin novedades). No guarda la caché.
+    """
+    dedupe.importar(cache.grupos)
+    if cache.fresca() or (cache.grupos and cache.sin_novedades(sp)):
+        return None
+    lanzamientos = list(iter_albumes_artista(sp, cache.artist_id, country=cache.country))
+    nuevos = [a for a in lanzamientos if a["id"] not in cache.lanzamientos]
+    stats = leer_lanzamientos(sp, cache.artist_id, nuevos, dedupe)
+    cache.lanzamientos.update(a["id"] for a in lanzamientos)
+    cache.total = len(lanzamientos)
+    return stats
+
+
+def rastrear_discografia(
+    sp: Spotify,
+    artist_id: str,
+    on_canciones: Optional[Callable[[List[Dict[str, str]]], None]] = None,
+    cancelar: Optional[threading.Event] = None,
+) -> List[Dict[str, str]]:
+    """
+    Devuelve TODAS las canciones del artista sin duplicados “alternos”
+    ({"id", "name", "clave"}; `clave` identifica la grabación canónica).
+    `on_canciones` recibe la lista completa hasta el momento tras cada bloque
+    (desde el hilo que rastrea). Si se activa `cancelar`, lanza
+    `RastreoCancelado` sin guardar nada.
+    """
+    def avance() -> None:
+        if cancelar is not None and cancelar.is_set():
+            raise RastreoCancelado(artist_id)
+        if on_canciones:
+            on_canciones(_canciones(dedupe))
+
+    dedupe = Deduplicador(sp, on_lote=avance)
+    cache = CacheDiscografia(artist_id)
+
+    # 1) Álbumes / singles / compilados: lo guardado + lanzamientos nuevos
+    try:
+        stats = actualizar_lanzamientos(sp, cache, dedupe)
+    except RastreoCancelado:
+        raise
+    except Exception as e:
+        logger.error("Error leyendo lanzamientos de %s: %s", artist_id, e)
+        stats = {}
+    if stats is None:
+        if not cache.fresca():
+            cache.guardar(dedupe)
+        return _canciones(dedupe)
+
+    # 2) Búsqueda global, salvo que la última no aportara y no haya lanzamientos nuevos
+    previa = cache.extra.get("busqueda") or {}
+    if previa.get("nuevas", 1) or not stats or stats.get("leidos"):
+        cache.extra["busqueda"] = buscar_sueltas(sp, artist_id, dedupe)
+    else:
+        logger.info("Búsqueda global de %s omitida: la anterior no aportó nada.", artist_id)
+
+    if stats:
+        cache.guardar(dedupe)
+    return _canciones(dedupe)
+
+
+def buscar_sueltas(sp: Spotify, artist_id: str, dedupe: Deduplicador) -> Dict[str, int]:
+    """
+    Pasada de búsqueda global por nombre del artista. Se detiene al agotar
+    resultados o tras `PAGINAS_SIN_NOVEDAD` páginas seguidas sin canciones
+    canónicas nuevas. Completa lo que no aparece en los lanzamientos.
+    Devuelve {"paginas", "nuevas"} (lo que aportó).
+    """
+    al_empezar = dedupe.claves_canonicas()
+    paginas = sin_novedad = 0
+    try:
+        art_name = sp.artist(artist_id)["name"]
+        for offset in range(0, MAX_BUSQUEDA, 50):
+            antes = dedupe.claves_canonicas()
+            sr = sp.search(q=f'artist:"{art_name}"', type="track",
+                           limit=50, offset=offset)
+            paginas += 1
+            for t in sr["tracks"]["items"]:
+                if any(a["id"] == artist_id for a in t["artists"]):
+                    dedupe.agregar(t)
+            sin_novedad = 0 if dedupe.claves_canonicas() - antes else sin_novedad + 1
+            if not sr["tracks"]["next"] or sin_novedad >= PAGINAS_SIN_NOVEDAD:
+                break
+    except RastreoCancelado:
+        raise
+    except Exception as e:
+        logger.error("Error en la búsqueda global de %s: %s", artist_id, e)
+    aporte = {"paginas": paginas,
+              "nuevas": len(dedupe.claves_canonicas() - al_empezar)}
+    logger.info("Búsqueda global de %s: %s", artist_id, aporte)
+    return aporte
+
+
+def _canciones(dedupe: Deduplicador) -> List[Dict[str, str]]:
+    return [
+        {"id": t["id"], "name": t["name"], "clave": clave}
+        for clave, t in dedupe.canonicas().items()
+    ]
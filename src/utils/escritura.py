@@ -0,0 +1,173 @@
+"""
+Escritura por lotes en playlists, con un diario en `cfg.DATA_DIR` para
+reanudar sin releer la playlist lo que quedó a medias tras un fallo.
+"""
+from __future__ import annotations
+import random
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from spotipy import Spotify
+from spotipy.exceptions import SpotifyException
+
+from ..config import logger, DATA_DIR
+from .catalogo import catalogo
+from .persistencia import cargar_json, guardar_json
+
+DIARIO_PATH = DATA_DIR / "escrituras_pendientes.json"
+LOTE = 100
+REINTENTOS_LOTE = 3
+
+_lock = threading.Lock()
+
+
+class ResultadoAgregado(NamedTuple):
+    """Resultado de una escritura en playlist."""
+    agregados: int                 # items escritos
+    omitidos: int                  # ya estaban en la playlist (o repetidos)
+    fallidos: int                  # no escritos por error de algún lote
+    snapshot_id: Optional[str]     # snapshot tras el último lote escrito
+
+
+def _diario() -> Dict[str, dict]:
+    return cargar_json(DIARIO_PATH, {})
+
+
+def _anotar(playlist_id: str, trabajo: Optional[dict]) -> None:
+    with _lock:
+        diario = _diario()
+        if trabajo is None:
+            diario.pop(playlist_id, None)
+        else:
+            diario[playlist_id] = trabajo
+        guardar_json(DIARIO_PATH, diario)
+
+
+def pendientes() -> Dict[str, dict]:
+    """{playlist_id: trabajo} con escrituras a medio terminar."""
+    with _lock:
+        return _diario()
+
+
+def _aterrizo(
+    sp: Spotify, playlist_id: str, lote: List[str], snapshot_previo: Optional[str]
+) -> Optional[str]:
+    """
+    Tras un fallo ambiguo (5xx, timeout…), ¿se aplicó `lote` de todos modos?
+    Si el snapshot_id sigue siendo el último de la cadena, no; si cambió, se
+    mira si la cola de la playlist es exactamente `lote`. Devuelve el
+    snapshot actual si el lote está, None si no. Los errores se propagan.
+    """
+    info = sp.playlist(playlist_id, fields="snapshot_id,tracks(total)")
+    snapshot = info.get("snapshot_id")
+    if snapshot_previo and snapshot == snapshot_previo:
+        return None
+    total = (info.get("tracks") or {}).get("total") or 0
+    if total < len(lote):
+        return None
+    cola = sp.playlist_items(playlist_id, fields="items(track(uri))",
+                             limit=len(lote), offset=total - len(lote))
+    uris = [(it.get("track") or {}).get("uri") for it in cola.get("items") or []]
+    return snapshot if uris == lote else None
+
+
+def _aplicar(sp: Spotify, playlist_id: str, trabajo: dict) -> ResultadoAgregado:
+    """
+    Escribe los lotes aún no aplicados de `trabajo`, anotando cada avance.
+    Un lote rechazado con un 4xx definitivo se descarta (cuenta como fallido)
+    y se sigue con el resto; solo los fallos ambiguos dejan el trabajo en el
+    diario para reanudarlo.
+    """
+    uris: List[str] = trabajo["uris"]
+    desde = trabajo["aplicados"] * LOTE
+    rechazados: List[int] = trabajo.setdefault("rechazados", [])
+    rechazadas = 0      # URIs rechazadas en esta llamada
+
+    def fallo(inicio: int) -> ResultadoAgregado:
+        _anotar(playlist_id, trabajo)
+        return ResultadoAgregado(inicio - desde - rechazadas, 0,
+                                 len(uris) - inicio + rechazadas,
+                                 (trabajo["snapshots"] or [None])[-1])
+
+    for inicio in range(desde, len(uris), LOTE):
+        lote = uris[inicio:inicio + LOTE]
+        previo = (trabajo["snapshots"] or [trabajo.get("snapshot_base")])[-1]
+        snapshot = None
+        for intento in range(REINTENTOS_LOTE + 1):
+            try:
+                # Un fallo anterior pudo haber escrito el lote: comprobar antes
+                if trabajo.get("dudoso"):
+                    snapshot = _aterrizo(sp, playlist_id, lote, previo)
+                    trabajo["dudoso"] = False
+                    if snapshot is not None:
+                        logger.info("Lote %s de %s ya estaba aplicado.",
+                                    inicio // LOTE, playlist_id)
+                        break
+                snapshot = (sp.playlist_add_items(playlist_id, lote) or {}).get("snapshot_id")
+                break
+            except SpotifyException as e:
+                if (e.http_status or 500) < 500 and e.http_status != 429:
+                    logger.error("Lote %s de %s rechazado (%s URIs descartadas): %s",
+                                 inicio // LOTE, playlist_id, len(lote), e)
+                    rechazados.append(inicio)
+                    rechazadas += len(lote)
+                    snapshot = previo
+                    break
+                trabajo["dudoso"] = True
+                error = e
+            except Exception as e:
+                trabajo["dudoso"] = True
+                error = e
+            if intento == REINTENTOS_LOTE:
+                logger.error("Lote %s de %s falló tras %s intentos: %s",
+                             inicio // LOTE, playlist_id, intento + 1, error)
+                return fallo(inicio)
+            espera = min(30.0, 2 ** intento) * random.uniform(0.5, 1.5)
+            logger.warning("Lote %s de %s falló (%s); reintento en %.1f s",
+                           inicio // LOTE, playlist_id, error, espera)
+            time.sleep(espera)
+        trabajo["aplicados"] += 1
+        trabajo["snapshots"].append(snapshot)
+        _anotar(playlist_id, trabajo)
+
+    _anotar(playlist_id, None)
+    snapshot = (trabajo["snapshots"] or [None])[-1]
+    escritas = [u for i in range(0, len(uris), LOTE) if i not in rechazados
+                for u in uris[i:i + LOTE]]
+    catalogo().anexar(playlist_id, trabajo.get("snapshot_base"), snapshot, escritas)
+    return ResultadoAgregado(len(uris) - desde - rechazadas, 0, rechazadas, snapshot)
+
+
+def escribir_en_lotes(sp: Spotify, playlist_id: str, uris: List[str]) -> ResultadoAgregado:
+    """
+    Agrega `uris` (ya filtradas contra la playlist) en lotes de 100. Si había
+    un trabajo pendiente en esa playlist, las URIs nuevas se suman al final de
+    ese trabajo (sin repetir las suyas) y se escribe todo junto; si vuelve a
+    fallar, quedan todas en el diario.
+    """
+    trabajo = pendientes().get(playlist_id)
+    if trabajo:
+        ya = set(trabajo["uris"])
+        nuevas = [u for u in uris if u not in ya]
+        logger.info("Reanudando escritura pendiente en %s (%s/%s lotes, +%s URIs)",
+                    playlist_id, trabajo["aplicados"],
+                    -(-len(trabajo["uris"]) // LOTE), len(nuevas))
+        trabajo["uris"].extend(nuevas)
+    elif not uris:
+        return ResultadoAgregado(0, 0, 0, None)
+    else:
+        trabajo = {
+            "uris": list(uris),
+            "aplicados": 0,
+            "snapshots": [],
+            "snapshot_base": catalogo().items_snapshot(playlist_id),
+            "creado": time.time(),
+        }
+    _anotar(playlist_id, trabajo)
+    return _aplicar(sp, playlist_id, trabajo)
+
+
+def reanudar_pendientes(sp: Spotify) -> Dict[str, ResultadoAgregado]:
+    """Termina todas las escrituras pendientes del diario."""
+    return {pid: _aplicar(sp, pid, trabajo) for pid, trabajo in pendientes().items()}
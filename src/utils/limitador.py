@@ -0,0 +1,207 @@
+"""
+Programador de solicitudes a la API de Spotify.
+
+Todas las llamadas HTTP del cliente (ver `auth.get_spotify_client`) pasan por
+un único `ProgramadorSolicitudes` que:
+- reparte el ritmo con un token bucket (`API_RPS`, ráfaga `API_RAFAGA`),
+- limita las llamadas en vuelo (`API_CONCURRENCIA`),
+- ante un 429 respeta `Retry-After` y pausa a TODOS los hilos,
+- reintenta 5xx y errores de red con backoff exponencial + jitter
+  (solo en GET; las escrituras solo se reintentan ante 429, que no se aplicó).
+
+Hay dos carriles de prioridad. Lo que dispara un clic del usuario va por el
+carril INTERACTIVA (el predeterminado) y se adelanta a los trabajos masivos,
+que se marcan con `with carril(FONDO):` (o `en_carril(FONDO, fn)` para tareas
+de un pool). El fondo conserva una cuota mínima: tras `cuota_interactiva`
+turnos seguidos de la interactiva con fondo esperando, el siguiente es suyo.
+"""
+from __future__ import annotations
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import requests
+import spotipy
+from spotipy.exceptions import SpotifyException
+
+from ..config import (
+    logger, API_RPS, API_RAFAGA, API_CONCURRENCIA, API_REINTENTOS, HTTP_TIMEOUT,
+)
+from .transporte import adaptador_cache, crear_sesion, estado_pool
+
+_REINTENTABLES = {500, 502, 503, 504}
+
+INTERACTIVA = "interactiva"
+FONDO = "fondo"
+_carril: ContextVar[str] = ContextVar("carril_api", default=INTERACTIVA)
+
+
+@contextmanager
+def carril(nombre: str) -> Iterator[None]:
+    """Las llamadas a la API dentro del bloque usan el carril `nombre`."""
+    token = _carril.set(nombre)
+    try:
+        yield
+    finally:
+        _carril.reset(token)
+
+
+def en_carril(nombre: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Envuelve `fn` para que corra en `nombre` (los hilos de un pool no heredan el carril)."""
+    def envuelta(*args, **kwargs):
+        with carril(nombre):
+            return fn(*args, **kwargs)
+    return envuelta
+
+
+def _retry_after(e: SpotifyException) -> Optional[float]:
+    try:
+        return float((e.headers or {}).get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class ProgramadorSolicitudes:
+    """Token bucket + límite de concurrencia + carriles de prioridad + reintentos."""
+
+    def __init__(
+        self,
+        tasa: float = API_RPS,
+        rafaga: int = API_RAFAGA,
+        concurrencia: int = API_CONCURRENCIA,
+        reintentos: int = API_REINTENTOS,
+        espera_base: float = 0.5,
+        espera_max: float = 60.0,
+        cuota_interactiva: int = 3,
+    ) -> None:
+        self.tasa = max(tasa, 0.1)
+        self.rafaga = max(rafaga, 1)
+        self.reintentos = reintentos
+        self.espera_base = espera_base
+        self.espera_max = espera_max
+        self.concurrencia = max(concurrencia, 1)
+        self.cuota_interactiva = max(cuota_interactiva, 1)
+        self._tokens = float(self.rafaga)
+        self._ultimo = time.monotonic()
+        self._pausa_hasta = 0.0
+        self._en_vuelo = 0
+        self._esperando = {INTERACTIVA: 0, FONDO: 0}
+        self._seguidas = 0  # turnos interactivos seguidos con fondo esperando
+        self._cond = threading.Condition()
+        self.stats: Dict[str, float] = {"solicitudes": 0, "reintentos": 0, "limitadas": 0,
+                                        INTERACTIVA: 0, FONDO: 0}
+
+    def _me_toca(self, nombre: str) -> bool:
+        otro = FONDO if nombre == INTERACTIVA else INTERACTIVA
+        if not self._esperando[otro]:
+            return True
+        turno_fondo = self._seguidas >= self.cuota_interactiva
+        return (nombre == FONDO) == turno_fondo
+
+    def _entrar(self, nombre: str) -> None:
+        """Bloquea hasta tener token, hueco de concurrencia y turno de carril."""
+        with self._cond:
+            self._esperando[nombre] += 1
+            try:
+                while True:
+                    ahora = time.monotonic()
+                    self._tokens = min(self.rafaga,
+                                       self._tokens + (ahora - self._ultimo) * self.tasa)
+                    self._ultimo = ahora
+                    if ahora < self._pausa_hasta:
+                        espera = self._pausa_hasta - ahora
+                    elif self._en_vuelo >= self.concurrencia or not self._me_toca(nombre):
+                        espera = None  # despierta con notify
+                    elif self._tokens < 1:
+                        espera = (1 - self._tokens) / self.tasa
+                    else:
+                        break
+                    self._cond.wait(espera)
+            finally:
+                self._esperando[nombre] -= 1
+            self._tokens -= 1
+            self._en_vuelo += 1
+            if nombre == FONDO:
+                self._seguidas = 0
+            elif self._esperando[FONDO]:
+                self._seguidas += 1
+            self.stats["solicitudes"] += 1
+            self.stats[nombre] += 1
+            self._cond.notify_all()
+
+    def _salir(self) -> None:
+        with self._cond:
+            self._en_vuelo -= 1
+            self._cond.notify_all()
+
+    def _pausar(self, segundos: float) -> None:
+        with self._cond:
+            self._pausa_hasta = max(self._pausa_hasta, time.monotonic() + segundos)
+
+    def _backoff(self, intento: int) -> float:
+        espera = min(self.espera_max, self.espera_base * 2 ** intento)
+        return espera * random.uniform(0.5, 1.5)
+
+    def ejecutar(self, fn: Callable[..., Any], *args, idempotente: bool = True, **kwargs) -> Any:
+        """Ejecuta `fn` respetando el ritmo y reintentando lo reintentable."""
+        nombre = _carril.get()
+        for intento in range(self.reintentos + 1):
+            self._entrar(nombre)
+            try:
+                try:
+                    return fn(*args, **kwargs)
+                except SpotifyException as e:
+                    if intento == self.reintentos:
+                        raise
+                    if e.http_status == 429:
+                        espera = _retry_after(e) or self._backoff(intento)
+                        self.stats["limitadas"] += 1
+                        self._pausar(espera)
+                        logger.warning("429 de Spotify: pausa de %.1f s", espera)
+                    elif e.http_status in _REINTENTABLES and idempotente:
+                        espera = self._backoff(intento)
+                    else:
+                        raise
+                except (requests.exceptions.ConnectionError,
+                        requests.exceptions.Timeout) as e:
+                    if intento == self.reintentos or not idempotente:
+                        raise
+                    espera = self._backoff(intento)
+                    logger.warning("Error de red (%s); reintento en %.1f s", e, espera)
+            finally:
+                self._salir()
+            self.stats["reintentos"] += 1
+            time.sleep(espera)
+
+
+class SpotifyLimitado(spotipy.Spotify):
+    """`spotipy.Spotify` cuyas llamadas HTTP pasan por un `ProgramadorSolicitudes`."""
+
+    def __init__(self, *args, programador: Optional[ProgramadorSolicitudes] = None, **kwargs):
+        # Sesión propia: sin el Retry interno de spotipy, que dormiría con el
+        # hilo ocupado y se tragaría los encabezados Retry-After.
+        kwargs.setdefault("requests_session", crear_sesion())
+        kwargs.setdefault("requests_timeout", HTTP_TIMEOUT)
+        super().__init__(*args, **kwargs)
+        self.programador = programador or ProgramadorSolicitudes()
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Contadores del limitador, uso del pool HTTP y de la caché."""
+        cache = adaptador_cache(self._session)
+        return {"api": dict(self.programador.stats), "http": estado_pool(self._session),
+                "cache": dict(cache.stats) if cache else {}}
+
+    def invalidar_playlist(self, playlist_id: str) -> None:
+        """Descarta lo cacheado de una playlist (las escrituras propias ya lo hacen)."""
+        cache = adaptador_cache(self._session)
+        if cache:
+            cache.invalidar_playlist(playlist_id)
+
+    def _internal_call(self, method, url, payload, params):
+        return self.programador.ejecutar(
+            super()._internal_call, method, url, payload, params,
+            idempotente=(method == "GET"),
+        )
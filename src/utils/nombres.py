@@ -0,0 +1,65 @@
+"""
+Caché persistente de nombres para mostrar (podcasts y playlists).
+
+Los nombres solo se usan en etiquetas y logs, así que se resuelven en bloque
+(shows de 50 en 50, playlists con un único listado del usuario) y se guardan
+en `cfg.DATA_DIR` para no volver a pedirlos en cada corrida.
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, Optional
+from spotipy import Spotify
+from ..config import DATA_DIR
+from .persistencia import cargar_json, guardar_json
+from .spotify_utils import obtener_shows, obtener_playlists_usuario
+
+NOMBRES_PATH = DATA_DIR / "nombres.json"
+
+
+class CacheNombres:
+    """{"shows": {id: nombre}, "playlists": {id: nombre}} respaldado en disco."""
+
+    def __init__(self) -> None:
+        datos = cargar_json(NOMBRES_PATH, {})
+        self.shows: Dict[str, str] = datos.get("shows", {})
+        self.playlists: Dict[str, str] = datos.get("playlists", {})
+        self._sucio = False
+
+    def show(self, show_id: str) -> str:
+        return self.shows.get(show_id) or f"Podcast {show_id[:8]}…"
+
+    def playlist(self, playlist_id: str) -> str:
+        return self.playlists.get(playlist_id) or f"Playlist {playlist_id[:8]}…"
+
+    def registrar_shows(self, shows: Dict[str, dict]) -> None:
+        """Guarda los nombres de objetos show ya descargados."""
+        for sid, show in shows.items():
+            if show.get("name") and self.shows.get(sid) != show["name"]:
+                self.shows[sid] = show["name"]
+                self._sucio = True
+
+    def resolver(
+        self,
+        sp: Spotify,
+        show_ids: Iterable[str] = (),
+        playlist_ids: Iterable[str] = (),
+        shows_descargados: Optional[Dict[str, dict]] = None,
+    ) -> None:
+        """Completa los nombres que falten con llamadas en bloque."""
+        if shows_descargados:
+            self.registrar_shows(shows_descargados)
+        faltan_shows = [s for s in dict.fromkeys(show_ids) if s not in self.shows]
+        if faltan_shows:
+            self.registrar_shows(obtener_shows(sp, faltan_shows))
+        if any(p not in self.playlists for p in playlist_ids):
+            try:
+                for pid, nombre, _ in obtener_playlists_usuario(sp):
+                    if self.playlists.get(pid) != nombre:
+                        self.playlists[pid] = nombre
+                        self._sucio = True
+            except Exception:
+                pass  # nombres cosméticos: se muestran los IDs abreviados
+
+    def guardar(self) -> None:
+        if self._sucio:
+            guardar_json(NOMBRES_PATH, {"shows": self.shows, "playlists": self.playlists})
+            self._sucio = False
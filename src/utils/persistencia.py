@@ -0,0 +1,39 @@
+"""
+Lectura/escritura de archivos JSON de estado local (en `cfg.DATA_DIR`).
+"""
+from __future__ import annotations
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+from ..config import logger
+
+
+def cargar_json(ruta: Path, defecto: Any) -> Any:
+    """Devuelve el contenido de `ruta` o `defecto` si no existe o está corrupto."""
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return defecto
+    except (OSError, ValueError) as e:
+        logger.warning("No se pudo leer %s (%s); se usa el valor por defecto.", ruta, e)
+        return defecto
+
+
+def guardar_json(ruta: Path, datos: Any) -> None:
+    """Escribe `datos` de forma atómica (archivo temporal + os.replace)."""
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=ruta.parent, prefix=ruta.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(datos, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, ruta)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
@@ -3,85 +3,210 @@ Funciones de uso general (playlists, podcasts, artistas…)
 """
 from __future__ import annotations
 import time
-from typing import List, Tuple, Set
+from typing import Dict, Iterator, List, Optional, Tuple, Set
 from spotipy import Spotify
-from ..config import logger
+from ..config import logger, PAGINAS_EN_PARALELO
+from .catalogo import Fila, catalogo
+from .paginacion import en_orden, paginar, seguir_siguiente
+from .escritura import ResultadoAgregado, escribir_en_lotes
 
 # --------------------------------------------------------------------------------
 # PLAYLISTS Y PODCASTS
 # --------------------------------------------------------------------------------
-def get_podcast_episodes(sp: Spotify, podcast_id: str) -> List[str]:
-    """Devuelve URIs de TODOS los episodios de un podcast (maneja paginación)."""
-    episodes, offset, limit = [], 0, 50
-    while True:
-        try:
-            resp = sp.show_episodes(podcast_id, limit=limit, offset=offset)
-            items = resp.get("items", [])
-            if not items:
-                break
-            episodes.extend(
-                [f"spotify:episode:{ep['id']}" for ep in items if ep and ep.get("id")]
-            )
-            offset += len(items)
-            if offset >= resp.get("total", 0):
-                break
-        except Exception as e:
-            logger.error("Error al obtener episodios de %s: %s", podcast_id, e)
-            break
+def anterior_a_marca(ep: dict, marca: Optional[Dict[str, str]]) -> bool:
+    """True si `ep` es el episodio de la marca o uno más viejo."""
+    if not marca:
+        return False
+    fecha = marca.get("fecha") or ""
+    ep_fecha = ep.get("release_date") or ""
+    return ep["id"] == marca.get("ultimo_id") or bool(ep_fecha and ep_fecha < fecha[:len(ep_fecha)])
+
+
+def iter_episodios_podcast(
+    sp: Spotify, podcast_id: str, marca: Optional[Dict[str, str]] = None
+) -> Iterator[dict]:
+    """
+    Recorre los episodios de un podcast del más nuevo al más viejo.
+    Con `marca` ({"ultimo_id", "fecha"} del último episodio ya sincronizado)
+    se detiene en el primer episodio conocido: un podcast al día cuesta una
+    sola página. Los errores de la API se propagan al llamador.
+    """
+    paginas = paginar(
+        lambda offset, limit: sp.show_episodes(podcast_id, limit=limit, offset=offset),
+        50,
+        # con marca casi siempre basta la primera página: no adelantar otras
+        paralelo=1 if marca else PAGINAS_EN_PARALELO,
+    )
+    for ep in paginas:
+        if not ep or not ep.get("id"):
+            continue
+        if anterior_a_marca(ep, marca):
+            return
+        yield ep
+
+
+def get_podcast_episodes(
+    sp: Spotify, podcast_id: str, marca: Optional[Dict[str, str]] = None
+) -> List[str]:
+    """Devuelve URIs de los episodios de un podcast (todos, o solo los posteriores a `marca`)."""
+    episodes = []
+    try:
+        for ep in iter_episodios_podcast(sp, podcast_id, marca):
+            episodes.append(f"spotify:episode:{ep['id']}")
+    except Exception as e:
+        logger.error("Error al obtener episodios de %s: %s", podcast_id, e)
     return episodes
 
 
-def get_playlist_items(sp: Spotify, playlist_id: str) -> List[str]:
-    """Devuelve URIs (track o episode) que ya existen en la playlist."""
-    items, offset = [], 0
-    while True:
+def obtener_shows(
+    sp: Spotify, show_ids: List[str], market: str = "US"
+) -> Dict[str, dict]:
+    """{show_id: show} usando el endpoint múltiple (50 IDs por llamada)."""
+    shows: Dict[str, dict] = {}
+    for i in range(0, len(show_ids), 50):
+        lote = show_ids[i:i + 50]
         try:
-            resp = sp.playlist_items(playlist_id, limit=100, offset=offset)
-            batch = resp.get("items", [])
-            if not batch:
-                break
-            for it in batch:
-                track = it.get("track")
-                if track and track.get("uri"):
-                    items.append(track["uri"])
-            offset += len(batch)
-            if not resp.get("next"):
-                break
+            resp = sp.shows(lote, market=market)
         except Exception as e:
-            logger.error("Error al leer playlist %s: %s", playlist_id, e)
-            break
-    return items
+            logger.error("Error al obtener shows %s…: %s", lote[0], e)
+            continue
+        for show in resp.get("shows", []):
+            if show and show.get("id"):
+                shows[show["id"]] = show
+    return shows
+
 
+def obtener_tracks(
+    sp: Spotify,
+    track_ids: List[str],
+    market: Optional[str] = None,
+    paralelo: int = PAGINAS_EN_PARALELO,
+) -> Dict[str, dict]:
+    """
+    {track_id pedido: track completo} con el endpoint múltiple (50 IDs por
+    llamada, varias en paralelo). Con `market` Spotify puede devolver otra
+    versión de la pista (ver `linked_from`); la clave sigue siendo el ID pedido.
+    """
+    lotes = [(track_ids[i:i + 50],) for i in range(0, len(track_ids), 50)]
 
-def add_episodes_to_playlist(sp: Spotify, playlist_id: str, episode_uris: list[str]) -> None:
-    """Agrega episodios evitando duplicados."""
-    existentes: Set[str] = set(get_playlist_items(sp, playlist_id))
-    nuevos = [uri for uri in episode_uris if uri not in existentes]
-    for i in range(0, len(nuevos), 100):
+    def pedir(lote: List[str]) -> List[tuple]:
         try:
-            sp.playlist_add_items(playlist_id, nuevos[i:i + 100])
+            return list(zip(lote, sp.tracks(lote, market=market).get("tracks", [])))
         except Exception as e:
-            logger.error("Error agregando episodios a %s: %s", playlist_id, e)
-            return
-    if nuevos:
-        logger.info("Agregados %s episodios nuevos a %s", len(nuevos), playlist_id)
+            logger.error("Error al obtener tracks %s…: %s", lote[0], e)
+            return []
+
+    tracks: Dict[str, dict] = {}
+    for pares in en_orden(pedir, lotes, paralelo):
+        tracks.update((tid, t) for tid, t in pares if t)
+    return tracks
+
+
+# Solo lo que usa `_fila_playlist` (+ paginación): evita bajar álbumes,
+# imágenes y mercados de cada pista.
+CAMPOS_ITEMS_PLAYLIST = (
+    "items(track(uri,id,name,type,artists(name),show(name))),total,next"
+)
+
+
+def _fila_playlist(track: dict) -> Fila:
+    """(uri, id, nombre, artista/show) de un item de playlist."""
+    if track.get("type") == "episode":
+        artista_show = (track.get("show") or {}).get("name")
     else:
+        artistas = track.get("artists") or []
+        artista_show = ", ".join(a["name"] for a in artistas) if artistas else None
+    return track.get("uri"), track.get("id"), track.get("name"), artista_show
+
+
+def snapshot_playlist(sp: Spotify, playlist_id: str) -> Optional[str]:
+    """snapshot_id actual de la playlist (una llamada mínima)."""
+    try:
+        return sp.playlist(playlist_id, fields="snapshot_id").get("snapshot_id")
+    except Exception as e:
+        logger.error("Error al leer snapshot de %s: %s", playlist_id, e)
+        return None
+
+
+def iter_playlist(sp: Spotify, playlist_id: str, completo: bool = False) -> Iterator[Fila]:
+    """
+    Filas (uri, id, nombre, artista) de la playlist, página a página. Si su
+    snapshot_id no cambió desde la última descarga, salen del catálogo local
+    sin paginar; si se recorre completa, queda guardada en el catálogo.
+    """
+    cat = catalogo()
+    snapshot = snapshot_playlist(sp, playlist_id)
+    guardadas = cat.items(playlist_id, snapshot, completo)
+    if guardadas is not None:
+        yield from guardadas
+        return
+    filas = []
+    try:
+        for it in paginar(
+            lambda offset, limit: sp.playlist_items(
+                playlist_id, fields=CAMPOS_ITEMS_PLAYLIST, limit=limit, offset=offset),
+            100,  # máximo permitido por la API
+        ):
+            if it.get("track"):
+                fila = _fila_playlist(it["track"])
+                filas.append(fila)
+                yield fila
+    except Exception as e:
+        logger.error("Error al leer playlist %s: %s", playlist_id, e)
+        return  # incompleta: no se guarda en el catálogo
+    cat.guardar_items(playlist_id, snapshot, filas)
+
+
+def leer_playlist(sp: Spotify, playlist_id: str, completo: bool = False) -> List[Fila]:
+    """Versión en lista de `iter_playlist`."""
+    return list(iter_playlist(sp, playlist_id, completo))
+
+
+def get_playlist_items(sp: Spotify, playlist_id: str) -> List[str]:
+    """Devuelve URIs (track o episode) que ya existen en la playlist."""
+    return [uri for uri, *_ in leer_playlist(sp, playlist_id) if uri]
+
+
+def add_episodes_to_playlist(
+    sp: Spotify,
+    playlist_id: str,
+    episode_uris: list[str],
+    existentes: Optional[Set[str]] = None,
+) -> ResultadoAgregado:
+    """
+    Agrega episodios evitando duplicados, en lotes de 100 (ver `escritura`).
+    Si el llamador ya leyó la playlist puede pasar `existentes` y se evita
+    una segunda lectura completa.
+    """
+    if existentes is None:
+        existentes = set(get_playlist_items(sp, playlist_id))
+    nuevos = [uri for uri in dict.fromkeys(episode_uris) if uri not in existentes]
+    res = escribir_en_lotes(sp, playlist_id, nuevos)
+    res = res._replace(omitidos=len(episode_uris) - len(nuevos))
+    if res.agregados:
+        logger.info("Agregados %s episodios nuevos a %s", res.agregados, playlist_id)
+    elif not res.fallidos:
         logger.info("No hay episodios nuevos para agregar.")
+    return res
+
+
+def iter_playlists_usuario(sp: Spotify) -> Iterator[dict]:
+    """Objetos playlist del usuario, página a página (registra sus snapshot_id)."""
+    vistas = []
+    for it in paginar(
+        lambda offset, limit: sp.current_user_playlists(limit=limit, offset=offset), 50
+    ):
+        vistas.append((it["id"], it["name"], it["tracks"]["total"], it.get("snapshot_id")))
+        yield it
+    catalogo().registrar_listado(vistas)
 
 
 def obtener_playlists_usuario(sp: Spotify) -> List[Tuple[str, str, int]]:
     """[(playlist_id, nombre, total_tracks)…]"""
-    playlists, offset = [], 0
-    while True:
-        res = sp.current_user_playlists(limit=50, offset=offset)
-        playlists += [
-            (it["id"], it["name"], it["tracks"]["total"])
-            for it in res.get("items", [])
-        ]
-        if not res.get("next"):
-            break
-        offset += 50
-    return playlists
+    return [
+        (it["id"], it["name"], it["tracks"]["total"])
+        for it in iter_playlists_usuario(sp)
+    ]
 
 
 def crear_playlist(sp: Spotify, nombre_playlist: str, public: bool = False) -> str:
@@ -102,39 +227,23 @@ def obtener_contenido_playlist(
     sp: Spotify, playlist_id: str
 ) -> List[Tuple[str, str, str]]:
     """[(track_id, nombre, artista/show)]"""
-    contenido, offset = [], 0
-    while True:
-        resp = sp.playlist_items(playlist_id, limit=50, offset=offset)
-        for it in resp.get("items", []):
-            track = it.get("track")
-            if not track:
-                continue
-            tid = track.get("id")
-            nombre = track.get("name", "Desconocido")
-            if track.get("type") == "episode":
-                artista_show = track.get("show", {}).get("name", "Desconocido")
-            else:
-                artistas = track.get("artists", [])
-                artista_show = ", ".join(a["name"] for a in artistas) if artistas else "Desconocido"
-            contenido.append((tid, nombre, artista_show))
-        if not resp.get("next"):
-            break
-        offset += 50
-    return contenido
+    return [
+        (tid, nombre or "Desconocido", artista or "Desconocido")
+        for _, tid, nombre, artista in leer_playlist(sp, playlist_id, completo=True)
+    ]
+
+
+def iter_artistas_seguidos(sp: Spotify) -> Iterator[dict]:
+    """Artistas seguidos, página a página (la siguiente se pide en segundo plano)."""
+    yield from seguir_siguiente(sp, sp.current_user_followed_artists(limit=50), "artists")
 
 
 def obtener_artistas_seguidos(sp: Spotify):
     artistas = []
     try:
-        datos = sp.current_user_followed_artists()
-        while datos:
-            for art in datos["artists"]["items"]:
-                genero = art["genres"][0] if art["genres"] else ""
-                artistas.append((art["id"], art["name"], genero))
-            if datos["artists"]["next"]:
-                datos = sp.next(datos["artists"])
-            else:
-                break
+        for art in iter_artistas_seguidos(sp):
+            genero = art["genres"][0] if art["genres"] else ""
+            artistas.append((art["id"], art["name"], genero))
     except Exception as e:
         logger.error("Error al obtener artistas seguidos: %s", e)
     return artistas
@@ -152,6 +261,54 @@ def obtener_podcasts_guardados(sp: Spotify):
     return podcasts
 
 
+def iter_albumes_artista(
+    sp: Spotify,
+    artista_id: str,
+    include_groups: str = "album,single,compilation,appears_on",
+    country: Optional[str] = None,
+) -> Iterator[dict]:
+    """Lanzamientos del artista (objetos álbum simplificados), en orden."""
+    yield from paginar(
+        lambda offset, limit: sp.artist_albums(
+            artista_id, album_type=include_groups, country=country,
+            limit=limit, offset=offset),
+        50,
+    )
+
+
+def iter_albumes_completos(
+    sp: Spotify,
+    album_ids: List[str],
+    market: Optional[str] = None,
+    paralelo: int = PAGINAS_EN_PARALELO,
+) -> Iterator[dict]:
+    """
+    Álbumes completos con TODAS sus pistas en `album["tracks"]["items"]`.
+    Se piden de 20 en 20 (el endpoint múltiple trae las primeras 50 pistas
+    de cada uno); solo los álbumes más largos necesitan páginas extra, que
+    se piden en paralelo. Los álbumes salen en el orden de `album_ids`.
+    """
+    def pedir_lote(ids: List[str]) -> List[dict]:
+        return [a for a in (sp.albums(ids, market=market) or {}).get("albums", []) if a]
+
+    def pedir_resto(album_id: str, offset: int) -> List[dict]:
+        pagina = sp.album_tracks(album_id, limit=50, offset=offset, market=market)
+        return pagina.get("items") or []
+
+    lotes = [(album_ids[i:i + 20],) for i in range(0, len(album_ids), 20)]
+    for albumes in en_orden(pedir_lote, lotes, paralelo):
+        resto = [
+            (alb["id"], offset)
+            for alb in albumes
+            for offset in range(len(alb["tracks"]["items"]),
+                                alb["tracks"].get("total") or 0, 50)
+        ]
+        por_id = {alb["id"]: alb for alb in albumes}
+        for (album_id, _offset), items in zip(resto, en_orden(pedir_resto, resto, paralelo)):
+            por_id[album_id]["tracks"]["items"].extend(items)
+        yield from albumes
+
+
 def obtener_canciones_artista(sp: Spotify, artista_id: str):
     try:
         resp = sp.artist_top_tracks(artista_id)
@@ -170,16 +327,17 @@ def obtener_episodios_podcast_sencillo(sp: Spotify, podcast_id: str):
         return []
 
 
-def agregar_canciones_a_playlist(sp: Spotify, playlist_id: str, track_ids: list[str]):
+def agregar_canciones_a_playlist(
+    sp: Spotify, playlist_id: str, track_ids: list[str]
+) -> ResultadoAgregado:
     existentes = set(get_playlist_items(sp, playlist_id))
     nuevos = [
         f"spotify:track:{tid}"
-        for tid in track_ids
+        for tid in dict.fromkeys(track_ids)
         if f"spotify:track:{tid}" not in existentes
     ]
-    for i in range(0, len(nuevos), 100):
-        try:
-            sp.playlist_add_items(playlist_id, nuevos[i:i + 100])
-        except Exception as e:
-            logger.error("Error agregando tracks a playlist: %s", e)
-            break
+    res = escribir_en_lotes(sp, playlist_id, nuevos)
+    if res.fallidos:
+        logger.error("No se agregaron %s tracks a %s; quedan pendientes.",
+                     res.fallidos, playlist_id)
+    return res._replace(omitidos=len(track_ids) - len(nuevos))
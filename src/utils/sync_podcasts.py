@@ -0,0 +1,241 @@
+"""
+Motor de sincronización podcast → playlist (data_podcasts): solo episodios
+posteriores a la marca de agua de cada podcast, escritos en lotes por playlist.
+"""
+from __future__ import annotations
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+from spotipy import Spotify
+from ..config import logger, SYNC_WORKERS, DATA_DIR
+from .persistencia import cargar_json, guardar_json
+from .nombres import CacheNombres
+from .limitador import FONDO, carril, en_carril
+from .escritura import reanudar_pendientes
+from .spotify_utils import (
+    anterior_a_marca,
+    iter_episodios_podcast,
+    obtener_shows,
+    get_playlist_items,
+    add_episodes_to_playlist,
+)
+
+ESTADO_PATH = DATA_DIR / "sync_podcasts.json"
+
+LogFn = Callable[[str], None]
+ProgresoFn = Callable[[int, int, str], None]
+
+
+def agrupar_por_playlist(pares: List[Dict[str, str]]) -> Dict[str, List[str]]:
+    """{playlist_id: [podcast_id, …]} conservando el orden de aparición."""
+    grupos: Dict[str, List[str]] = {}
+    for p in pares:
+        shows = grupos.setdefault(p["playlist"], [])
+        if p["podcast"] not in shows:
+            shows.append(p["podcast"])
+    return grupos
+
+
+def cargar_estado() -> Dict[str, dict]:
+    """
+    Estado persistido:
+    {"shows": {podcast_id: {"ultimo_id", "fecha", "total_episodes", "playlists"}}}.
+    """
+    estado = cargar_json(ESTADO_PATH, {})
+    estado.setdefault("shows", {})
+    return estado
+
+
+def _cubiertas(marca: Optional[dict]) -> set:
+    """Playlists que ya recibieron todo lo anterior a `marca`."""
+    return set((marca or {}).get("playlists") or [])
+
+
+def _leer_podcast(
+    sp: Spotify, pod_id: str, marca: Optional[Dict[str, str]], completo: bool
+) -> tuple[List[str], int, Optional[Dict[str, str]]]:
+    """
+    (URIs de episodios, cuántos de ellos son posteriores a `marca`, marca
+    nueva). La marca es el último episodio sincronizado: sin `completo` solo
+    se piden los posteriores. Con `completo` (alguna playlist destino que la
+    marca no cubre) se lee todo el catálogo aunque haya marca.
+    """
+    eps = list(iter_episodios_podcast(sp, pod_id, None if completo else marca))
+    nuevos = next((i for i, ep in enumerate(eps) if anterior_a_marca(ep, marca)), len(eps))
+    if eps:
+        marca = {"ultimo_id": eps[0]["id"], "fecha": eps[0].get("release_date") or ""}
+    return [f"spotify:episode:{ep['id']}" for ep in eps], nuevos, marca
+
+
+def _sincronizar_playlist(
+    sp: Spotify,
+    pl_id: str,
+    shows: List[str],
+    episodios: Dict[str, List[str]],
+    nombres: CacheNombres,
+) -> tuple[int, List[str], bool]:
+    """Escribe en `pl_id` los episodios nuevos de `shows`. Devuelve (nuevos, líneas, ok)."""
+    playlist_name = nombres.playlist(pl_id)
+    existentes = set(get_playlist_items(sp, pl_id))
+    vistos = set(existentes)
+    mezcla: List[str] = []
+    lineas: List[str] = []
+    for pod_id in shows:
+        nuevos_show = [u for u in episodios.get(pod_id, []) if u not in vistos]
+        vistos.update(nuevos_show)
+        mezcla.extend(nuevos_show)
+        nombre = nombres.show(pod_id)
+        if nuevos_show:
+            lineas.append(f"✅ {nombre}: {len(nuevos_show)} nuevos → {playlist_name}")
+        else:
+            lineas.append(f"• {nombre}: 0 nuevos")
+
+    if not mezcla:
+        return 0, lineas, True
+    res = add_episodes_to_playlist(sp, pl_id, mezcla, existentes=existentes)
+    if res.fallidos:
+        lineas.append(f"❌ {playlist_name}: {res.fallidos} episodios sin escribir.")
+    return res.agregados, lineas, not res.fallidos
+
+
+def sincronizar_pares(
+    sp: Spotify,
+    pares: List[Dict[str, str]],
+    workers: int = SYNC_WORKERS,
+    on_log: Optional[LogFn] = None,
+    on_progreso: Optional[ProgresoFn] = None,
+) -> Dict[str, float]:
+    """
+    Sincroniza todos los pares {"podcast", "playlist"} usando `workers` hilos.
+    Devuelve un resumen
+    {"pares", "playlists", "sin_cambios", "nuevos", "errores", "segundos"}.
+
+    Primero termina las escrituras que una corrida anterior dejó a medias;
+    luego lee los episodios de cada podcast distinto (salta los que no
+    cambiaron `total_episodes` ni tienen destinos nuevos) y, por último, una
+    tarea por playlist que la lee una vez y escribe lo nuevo de todos sus
+    podcasts. La marca de un podcast solo avanza si todas sus playlists se
+    escribieron. Todo va por el carril FONDO; `on_log` y `on_progreso` se
+    invocan desde los hilos de trabajo (la GUI debe pasarlos por una cola).
+    """
+    log = on_log or (lambda _msg: None)
+    progreso = on_progreso or (lambda _hechos, _total, _msg: None)
+    grupos = agrupar_por_playlist(pares)
+    shows = list(dict.fromkeys(p["podcast"] for p in pares))
+    total = len(shows) + len(grupos)
+    resumen = {"pares": len(pares), "playlists": len(grupos), "sin_cambios": 0,
+               "nuevos": 0, "errores": 0, "segundos": 0.0}
+    inicio = time.monotonic()
+    hechos = 0
+    episodios: Dict[str, List[str]] = {}
+    posteriores: Dict[str, int] = {}
+    estado = cargar_estado()
+    destinos: Dict[str, set] = {}
+    for p in pares:
+        destinos.setdefault(p["podcast"], set()).add(p["playlist"])
+    # podcasts con alguna playlist destino que su marca aún no cubre
+    completos = {pod_id for pod_id in shows
+                 if not destinos[pod_id] <= _cubiertas(estado["shows"].get(pod_id))}
+    marcas: Dict[str, Dict[str, str]] = {}
+    fallidos: set = set()
+
+    # Fase 0: escrituras pendientes; total_episodes y nombres en pocas llamadas
+    with carril(FONDO):
+        for pl_id, res in reanudar_pendientes(sp).items():
+            if res.fallidos:
+                resumen["errores"] += 1
+                log(f"❌ Escritura pendiente en {pl_id[:8]}…: {res.fallidos} sin escribir.")
+            else:
+                log(f"↻ Escritura pendiente en {pl_id[:8]}… completada ({res.agregados}).")
+        info = obtener_shows(sp, shows)
+        nombres = CacheNombres()
+        nombres.resolver(sp, playlist_ids=grupos, shows_descargados=info)
+    totales: Dict[str, int] = {}
+    pendientes: List[str] = []
+    for pod_id in shows:
+        total_eps = info.get(pod_id, {}).get("total_episodes")
+        previo = estado["shows"].get(pod_id, {})
+        if (total_eps is not None and total_eps == previo.get("total_episodes")
+                and pod_id not in completos):
+            resumen["sin_cambios"] += 1
+            hechos += 1
+            continue
+        if total_eps is not None:
+            totales[pod_id] = total_eps
+        pendientes.append(pod_id)
+    if resumen["sin_cambios"]:
+        log(f"• {resumen['sin_cambios']} podcasts sin cambios desde la última corrida.")
+        progreso(hechos, total, "Podcasts sin cambios omitidos")
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        # Fase 1: episodios de cada podcast con cambios
+        futuros = {
+            pool.submit(en_carril(FONDO, _leer_podcast),
+                        sp, pod_id, estado["shows"].get(pod_id), pod_id in completos): pod_id
+            for pod_id in pendientes
+        }
+        for fut in as_completed(futuros):
+            pod_id = futuros[fut]
+            try:
+                eps, posteriores[pod_id], marcas[pod_id] = fut.result()
+            except Exception as e:
+                logger.error("Error leyendo podcast %s: %s", pod_id, e)
+                fallidos.add(pod_id)
+                resumen["errores"] += 1
+                linea = f"❌ {nombres.show(pod_id)}: error al leer episodios."
+                log(linea)
+                progreso(hechos + 1, total, linea)
+            else:
+                if eps:
+                    episodios[pod_id] = eps
+                progreso(hechos + 1, total, f"{nombres.show(pod_id)}: {len(eps)} episodios nuevos")
+            hechos += 1
+
+        # Fase 2: una lectura y una escritura mezclada por playlist. Las
+        # playlists que la marca ya cubre solo reciben lo posterior a ella.
+        def episodios_para(pl_id: str) -> Dict[str, List[str]]:
+            return {
+                pod_id: (eps if pl_id not in _cubiertas(estado["shows"].get(pod_id))
+                         else eps[:posteriores[pod_id]])
+                for pod_id, eps in episodios.items()
+            }
+
+        por_playlist = {pl_id: episodios_para(pl_id) for pl_id in grupos}
+        futuros = {
+            pool.submit(en_carril(FONDO, _sincronizar_playlist),
+                        sp, pl_id, pods, por_playlist[pl_id], nombres): pl_id
+            for pl_id, pods in grupos.items()
+            if any(por_playlist[pl_id].get(p) for p in pods)
+        }
+        hechos += len(grupos) - len(futuros)
+        for fut in as_completed(futuros):
+            pl_id = futuros[fut]
+            try:
+                nuevos, lineas, ok = fut.result()
+            except Exception as e:
+                logger.error("Error sincronizando playlist %s: %s", pl_id, e)
+                nuevos, lineas, ok = 0, [f"❌ Playlist {pl_id[:8]}…: {e}"], False
+            if not ok:
+                resumen["errores"] += 1
+                fallidos.update(grupos[pl_id])
+            hechos += 1
+            resumen["nuevos"] += nuevos
+            for linea in lineas:
+                log(linea)
+            progreso(hechos, total, lineas[-1] if lineas else pl_id)
+
+    for pod_id, marca in marcas.items():
+        if pod_id in fallidos:
+            continue
+        marca = dict(marca or {})
+        if pod_id in totales:
+            marca["total_episodes"] = totales[pod_id]
+        marca["playlists"] = sorted(destinos[pod_id])
+        if marca:
+            estado["shows"][pod_id] = marca
+    guardar_json(ESTADO_PATH, estado)
+    nombres.guardar()
+
+    resumen["segundos"] = round(time.monotonic() - inicio, 2)
+    logger.info("Sincronización terminada: %s", resumen)
+    return resumen
@@ -0,0 +1,69 @@
+"""
+Sesión HTTP del cliente de Spotify.
+
+Un único `requests.Session` con un pool de conexiones keep-alive por host del
+tamaño de la concurrencia del limitador: los hilos reutilizan conexiones TLS
+ya abiertas en vez de abrir nuevas, y `pool_block` impide pasarse del límite
+por host. `estado_pool` informa cuánto se reutilizó.
+
+Si `HTTP_CACHE_MB` > 0, las llamadas a api.spotify.com pasan además por la
+caché condicional de `cache_http`.
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..config import HTTP_POOL, HTTP_CACHE_MB
+from .cache_http import API, AdaptadorCache, crear_adaptador_cache
+
+
+def crear_sesion(pool: int = HTTP_POOL, cache_mb: int = HTTP_CACHE_MB) -> requests.Session:
+    """Sesión con pool de `pool` conexiones por host y sin reintentos propios."""
+    sesion = requests.Session()
+    opciones = dict(
+        pool_connections=4,          # hosts distintos que se mantienen (api, accounts…)
+        pool_maxsize=max(pool, 1),   # conexiones vivas por host
+        pool_block=True,             # nunca más de `pool` conexiones a un host
+        max_retries=0,               # los reintentos los hace el limitador
+    )
+    adaptador = HTTPAdapter(**opciones)
+    sesion.mount("https://", adaptador)
+    sesion.mount("http://", adaptador)
+    if cache_mb > 0:
+        sesion.mount(API.rsplit("/", 1)[0] + "/", crear_adaptador_cache(cache_mb, **opciones))
+    sesion.headers["Connection"] = "keep-alive"
+    return sesion
+
+
+def adaptador_cache(sesion: requests.Session) -> Optional[AdaptadorCache]:
+    """El adaptador de caché montado en la sesión, si lo hay."""
+    for adaptador in sesion.adapters.values():
+        if isinstance(adaptador, AdaptadorCache):
+            return adaptador
+    return None
+
+
+def estado_pool(sesion: requests.Session) -> List[Dict[str, object]]:
+    """Uso de cada pool: conexiones abiertas, solicitudes y conexiones libres."""
+    estado = []
+    for adaptador in dict.fromkeys(sesion.adapters.values()):
+        pools = getattr(getattr(adaptador, "poolmanager", None), "pools", None)
+        if pools is None:
+            continue
+        for clave in list(pools.keys()):
+            pool = pools.get(clave)
+            if pool is None:
+                continue
+            abiertas = getattr(pool, "num_connections", 0)
+            solicitudes = getattr(pool, "num_requests", 0)
+            estado.append({
+                "host": getattr(pool, "host", "?"),
+                "conexiones": abiertas,
+                "solicitudes": solicitudes,
+                "libres": pool.pool.qsize() if getattr(pool, "pool", None) else 0,
+                "max": getattr(pool.pool, "maxsize", None) if getattr(pool, "pool", None) else None,
+                "reuso": round(1 - abiertas / solicitudes, 3) if solicitudes else 0.0,
+            })
+    return estado